@@ -32,14 +32,16 @@ def convert_state_snapshots_to_events(state_snapshots):
     """
     events = []
 
-    # Group snapshots by pairs (before/after tool calls)
+    # Older logs hold a before/after snapshot pair per tool call; newer logs
+    # hold one 'after_<tool>' delta snapshot per state-changing tool call
     for i, snapshot in enumerate(state_snapshots):
         metadata = snapshot.get('metadata', {})
         tool_name = metadata.get('tool_name', 'unknown_tool')
+        action_trigger = snapshot.get('action_trigger', '')
 
         # Create a ToolExecutionEvent from state snapshot
-        if 'before_' in snapshot.get('action_trigger', ''):
-            # This is a before snapshot, create a mock ToolExecutionEvent
+        if 'before_' in action_trigger or metadata.get('delta'):
+            # One snapshot per tool call, create a mock ToolExecutionEvent
             event = ToolExecutionEvent(
                 timestamp=snapshot.get('timestamp', 0),
                 tool_name=tool_name,
@@ -8,7 +8,9 @@ cliff at 3,000+ tokens identified in the tau2-bench analysis.
 
 import time
 import copy
-from typing import Any, Dict, List, Optional, Union
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 
 try:
@@ -23,7 +25,89 @@ from tau2.data_model.message import Message, SystemMessage, UserMessage, Assista
 from tau2_enhanced.logging import ExecutionLogger
 
 
-@dataclass
+# Most recent context reductions kept for statistics
+_MAX_REDUCTION_HISTORY = 1024
+
+# Token counts keyed by (encoding name, text), cleared when it reaches the size limit
+_TOKEN_COUNT_CACHE_SIZE = 4096
+_TOKEN_COUNTS: Dict[Tuple[str, str], int] = {}
+
+# Messages with more content characters than this are candidates for compression
+_VERBOSE_CONTENT_LENGTH = 1000
+
+
+@lru_cache(maxsize=8)
+def _get_tiktoken_encoding(encoding_name: str):
+    """
+    Get a tiktoken encoding, shared by every agent in the process.
+
+    Building an encoding loads its BPE ranks, which is far more expensive
+    than the encode calls themselves, so each one is created only once.
+
+    Args:
+        encoding_name: Name of the tiktoken encoding (e.g. "cl100k_base")
+
+    Returns:
+        The tiktoken Encoding object
+    """
+    return tiktoken.get_encoding(encoding_name)
+
+
+def _count_tokens(texts: List[str], tokenizer) -> int:
+    """
+    Count the tokens in a list of texts.
+
+    Estimation runs over the whole conversation several times per turn, so
+    counts are memoized per text, and texts not seen before are encoded
+    together with one encode_batch call.
+
+    Args:
+        texts: Texts to tokenize
+        tokenizer: tiktoken Encoding used for the count
+
+    Returns:
+        Total number of tokens across all texts
+    """
+    counts = _TOKEN_COUNTS
+    name = tokenizer.name
+    total = 0
+    missing = []
+    for text in texts:
+        count = counts.get((name, text))
+        if count is None:
+            missing.append(text)
+        else:
+            total += count
+
+    if missing:
+        unique = list(dict.fromkeys(missing))
+        new_counts = {
+            text: len(tokens)
+            for text, tokens in zip(unique, tokenizer.encode_batch(unique))
+        }
+        total += sum(new_counts[text] for text in missing)
+
+        if len(counts) + len(new_counts) > _TOKEN_COUNT_CACHE_SIZE:
+            counts.clear()
+        counts.update(((name, text), count) for text, count in new_counts.items())
+
+    return total
+
+
+def _total_content_length(messages: List[Message]) -> int:
+    """
+    Sum the content lengths of a list of messages.
+
+    Args:
+        messages: Messages to measure (missing or empty content counts as 0)
+
+    Returns:
+        Total number of content characters
+    """
+    return sum(len(getattr(msg, 'content', None) or '') for msg in messages)
+
+
+@dataclass(slots=True)
 class ContextReductionResult:
     """Results of a context reduction operation."""
     original_token_count: int
@@ -37,7 +121,7 @@ class ContextReductionResult:
     bytes_saved: int
 
 
-@dataclass
+@dataclass(slots=True)
 class TokenUsageStats:
     """Token usage statistics for monitoring."""
     current_tokens: int
@@ -76,7 +160,7 @@ class ContextManagedLLMAgent(LLMAgent):
         # Token estimation
         if TIKTOKEN_AVAILABLE:
             try:
-                self.tokenizer = tiktoken.get_encoding("cl100k_base")
+                self.tokenizer = _get_tiktoken_encoding("cl100k_base")
             except Exception:
                 self.tokenizer = None
                 print("Warning: Could not initialize tiktoken encoder. Using approximation.")
@@ -84,7 +168,10 @@ class ContextManagedLLMAgent(LLMAgent):
             self.tokenizer = None
 
         # Context reduction history
-        self.reduction_history: List[ContextReductionResult] = []
+        self.reduction_history: Deque[ContextReductionResult] = deque(
+            maxlen=_MAX_REDUCTION_HISTORY
+        )
+        self._reset_reduction_totals()
 
         # Initialize context logger
         self.context_logger = ExecutionLogger(
@@ -128,7 +215,12 @@ class ContextManagedLLMAgent(LLMAgent):
         Returns:
             Token usage statistics
         """
-        current_tokens = self.estimate_tokens(messages)
+        # The character-based estimate is cheap; only run the tokenizer when
+        # usage may be close enough to the warning threshold to matter
+        current_tokens = self._approximate_estimate(messages)
+        if (self.tokenizer and
+                current_tokens >= self.warning_threshold * self.context_limit * 0.9):
+            current_tokens = self._tiktoken_estimate(messages)
         utilization = current_tokens / self.context_limit
 
         return TokenUsageStats(
@@ -156,23 +248,21 @@ class ContextManagedLLMAgent(LLMAgent):
 
     def _tiktoken_estimate(self, messages: List[Message]) -> int:
         """Use tiktoken for accurate token counting."""
-        total_tokens = 0
+        texts = []
 
         for msg in messages:
             # Count content tokens
             if hasattr(msg, 'content') and msg.content:
-                total_tokens += len(self.tokenizer.encode(msg.content))
+                texts.append(msg.content)
 
             # Count tool call tokens
             if hasattr(msg, 'tool_calls') and msg.tool_calls:
                 for tool_call in msg.tool_calls:
                     if hasattr(tool_call, 'arguments'):
-                        total_tokens += len(self.tokenizer.encode(str(tool_call.arguments)))
-
-            # Add overhead for message structure (role, metadata, etc.)
-            total_tokens += 10  # Estimated overhead per message
+                        texts.append(str(tool_call.arguments))
 
-        return total_tokens
+        # Add overhead for message structure (role, metadata, etc.)
+        return _count_tokens(texts, self.tokenizer) + len(messages) * 10
 
     def _approximate_estimate(self, messages: List[Message]) -> int:
         """Use approximate token counting when tiktoken is unavailable."""
@@ -220,8 +310,9 @@ class ContextManagedLLMAgent(LLMAgent):
             reduced_messages = self._preventive_context_reduction(original_messages)
             strategy = "preventive_reduction"
 
-        # Create modified state
-        modified_state = copy.deepcopy(state)
+        # Create modified state; messages are never mutated in place, so the
+        # state shares unchanged messages instead of deep-copying them
+        modified_state = copy.copy(state)
         modified_state.messages = reduced_messages
 
         # Calculate reduction metrics
@@ -253,7 +344,7 @@ class ContextManagedLLMAgent(LLMAgent):
             bytes_saved=original_bytes - reduced_bytes
         )
 
-        self.reduction_history.append(reduction_result)
+        self._append_reduction(reduction_result)
 
         # Log the context reduction
         self.context_logger.log_context_reduction(
@@ -374,13 +465,8 @@ class ContextManagedLLMAgent(LLMAgent):
 
     def _is_verbose_message(self, message: Message) -> bool:
         """Check if a message is verbose and suitable for compression."""
-        if not hasattr(message, 'content') or not message.content:
-            return False
-
-        content_length = len(message.content)
-
         # Consider messages verbose if they're very long
-        return content_length > 1000
+        return len(getattr(message, 'content', None) or '') > _VERBOSE_CONTENT_LENGTH
 
     def _compress_message_content(self, message: Message, compression_level: float = 0.7) -> Message:
         """
@@ -404,18 +490,22 @@ class ContextManagedLLMAgent(LLMAgent):
             return message  # No compression needed
 
         # For tool responses, preserve key information
-        if 'error' in original_content.lower():
+        lowered_content = original_content.lower()
+        if 'error' in lowered_content:
             # Keep error messages more detailed
-            compressed_content = original_content[:target_length] + " [error details truncated]"
-        elif any(keyword in original_content.lower() for keyword in ['success', 'completed', 'done']):
+            head, marker = original_content[:target_length], " [error details truncated]"
+        elif ('success' in lowered_content or 'completed' in lowered_content
+              or 'done' in lowered_content):
             # Compress successful operations more aggressively
-            compressed_content = original_content[:target_length//2] + " [operation successful, details truncated]"
+            head = original_content[:target_length//2]
+            marker = " [operation successful, details truncated]"
         else:
             # General compression
-            compressed_content = original_content[:target_length] + " [content truncated]"
+            head, marker = original_content[:target_length], " [content truncated]"
+        compressed_content = ''.join((head, marker))
 
         # Create new message with compressed content
-        new_message = copy.deepcopy(message)
+        new_message = copy.copy(message)
         new_message.content = compressed_content
 
         return new_message
@@ -436,14 +526,8 @@ class ContextManagedLLMAgent(LLMAgent):
         message_preservation = len(reduced_messages) / len(original_messages) if original_messages else 1.0
 
         # Calculate content preservation
-        original_content_length = sum(
-            len(msg.content) if hasattr(msg, 'content') and msg.content else 0
-            for msg in original_messages
-        )
-        reduced_content_length = sum(
-            len(msg.content) if hasattr(msg, 'content') and msg.content else 0
-            for msg in reduced_messages
-        )
+        original_content_length = _total_content_length(original_messages)
+        reduced_content_length = _total_content_length(reduced_messages)
 
         content_preservation = (reduced_content_length / original_content_length
                               if original_content_length > 0 else 1.0)
@@ -451,10 +535,63 @@ class ContextManagedLLMAgent(LLMAgent):
         # Weighted average (favor content preservation)
         return 0.3 * message_preservation + 0.7 * content_preservation
 
+    def _append_reduction(self, reduction_result: ContextReductionResult):
+        """
+        Add a context reduction to the history and the running totals.
+
+        When the history is full, the evicted result is subtracted from the
+        totals so they always describe exactly what reduction_history holds.
+
+        Args:
+            reduction_result: Result of the reduction just applied
+        """
+        if len(self.reduction_history) == self.reduction_history.maxlen:
+            self._update_reduction_totals(self.reduction_history[0], -1)
+        self.reduction_history.append(reduction_result)
+        self._update_reduction_totals(reduction_result, 1)
+
+    def _update_reduction_totals(self, result: ContextReductionResult, sign: int):
+        """Add (sign=1) or remove (sign=-1) a reduction from the running totals."""
+        token_savings = result.original_token_count - result.reduced_token_count
+
+        totals = self._reduction_totals
+        totals['token_savings'] += sign * token_savings
+        totals['information_preserved'] += sign * result.information_preserved
+        totals['processing_time'] += sign * result.performance_impact
+        totals['messages_dropped'] += sign * result.messages_dropped
+        totals['bytes_saved'] += sign * result.bytes_saved
+
+        strategy_totals = self._strategy_totals.setdefault(
+            result.reduction_strategy,
+            {'count': 0, 'token_savings': 0, 'information_preserved': 0.0}
+        )
+        strategy_totals['count'] += sign
+        strategy_totals['token_savings'] += sign * token_savings
+        strategy_totals['information_preserved'] += sign * result.information_preserved
+
+    def _reset_reduction_totals(self):
+        """Reset the running totals behind get_context_statistics."""
+        self._reduction_totals = {
+            'token_savings': 0,
+            'information_preserved': 0.0,
+            'processing_time': 0.0,
+            'messages_dropped': 0,
+            'bytes_saved': 0
+        }
+        self._strategy_totals: Dict[str, Dict[str, float]] = {}
+
+    def _clear_reduction_history(self):
+        """Clear the reduction history and its running statistics."""
+        self.reduction_history.clear()
+        self._reset_reduction_totals()
+
     def get_context_statistics(self) -> Dict[str, Any]:
         """
         Get comprehensive statistics about context management.
 
+        Statistics cover the most recent reductions still held in
+        reduction_history (up to _MAX_REDUCTION_HISTORY).
+
         Returns:
             Dictionary with context reduction performance metrics
         """
@@ -467,48 +604,35 @@ class ContextManagedLLMAgent(LLMAgent):
                 'strategy_usage': {}
             }
 
-        # Calculate aggregate statistics
         total_reductions = len(self.reduction_history)
-        token_savings = [r.original_token_count - r.reduced_token_count for r in self.reduction_history]
-        avg_token_savings = sum(token_savings) / len(token_savings)
-
-        information_scores = [r.information_preserved for r in self.reduction_history]
-        avg_information_preservation = sum(information_scores) / len(information_scores)
-
-        total_processing_time = sum(r.performance_impact for r in self.reduction_history)
+        totals = self._reduction_totals
 
         # Strategy usage analysis
         strategy_usage = {}
-        for result in self.reduction_history:
-            strategy = result.reduction_strategy
-            if strategy not in strategy_usage:
-                strategy_usage[strategy] = {
-                    'count': 0,
-                    'average_token_savings': 0,
-                    'average_information_preservation': 0
-                }
-
-            strategy_usage[strategy]['count'] += 1
-            strategy_usage[strategy]['average_token_savings'] += (
-                result.original_token_count - result.reduced_token_count
-            )
-            strategy_usage[strategy]['average_information_preservation'] += result.information_preserved
-
-        # Calculate averages for each strategy
-        for strategy_stats in strategy_usage.values():
-            if strategy_stats['count'] > 0:
-                strategy_stats['average_token_savings'] /= strategy_stats['count']
-                strategy_stats['average_information_preservation'] /= strategy_stats['count']
+        for strategy, strategy_totals in self._strategy_totals.items():
+            count = strategy_totals['count']
+            if count <= 0:
+                continue  # Only used by reductions evicted from the history
+            strategy_usage[strategy] = {
+                'count': count,
+                'average_token_savings': strategy_totals['token_savings'] / count,
+                'average_information_preservation':
+                    strategy_totals['information_preserved'] / count
+            }
 
         return {
             'total_reductions': total_reductions,
-            'average_token_savings': avg_token_savings,
-            'average_information_preservation': avg_information_preservation,
-            'total_processing_time': total_processing_time,
+            'average_token_savings': totals['token_savings'] / total_reductions,
+            'average_information_preservation':
+                totals['information_preserved'] / total_reductions,
+            'total_processing_time': totals['processing_time'],
             'strategy_usage': strategy_usage,
-            'max_token_savings': max(token_savings) if token_savings else 0,
-            'total_messages_dropped': sum(r.messages_dropped for r in self.reduction_history),
-            'total_bytes_saved': sum(r.bytes_saved for r in self.reduction_history)
+            # A running maximum cannot be updated on eviction, so scan the bounded window
+            'max_token_savings': max(
+                r.original_token_count - r.reduced_token_count for r in self.reduction_history
+            ),
+            'total_messages_dropped': totals['messages_dropped'],
+            'total_bytes_saved': totals['bytes_saved']
         }
 
     def set_context_limit(self, limit: int):
@@ -7,6 +7,7 @@ addressing both the 87% action execution failure rate and the 53% performance
 cliff from context pressure.
 """
 
+import asyncio
 import time
 import copy
 from typing import Any, Dict, List, Optional, Union
@@ -17,7 +18,7 @@ from .context_agent import ContextManagedLLMAgent, ContextReductionResult, Token
 from tau2_enhanced.logging import ExecutionLogger
 
 
-@dataclass
+@dataclass(slots=True)
 class EnhancedPerformanceMetrics:
     """Combined performance metrics for the enhanced agent."""
     # Context management metrics
@@ -122,6 +123,17 @@ class EnhancedLLMAgent(RetryManagedLLMAgent, ContextManagedLLMAgent):
 
         return result
 
+    async def generate_next_message_async(self, message, state):
+        """
+        Async variant of generate_next_message.
+
+        Runs the full enhanced pipeline (context reduction, enhanced retry
+        guidance and combined metrics) in a worker thread. Unlike
+        RetryManagedLLMAgent.generate_next_message_async, the backoff between
+        retries therefore blocks that worker thread rather than being awaited.
+        """
+        return await asyncio.to_thread(self.generate_next_message, message, state)
+
     def _generate_with_base_agent(self, message, state):
         """
         Generate message using the base LLMAgent (bypassing retry logic).
@@ -198,7 +210,7 @@ class EnhancedLLMAgent(RetryManagedLLMAgent, ContextManagedLLMAgent):
                 retry_sequence.final_success = True
                 retry_sequence.total_duration = time.time() - start_time
 
-                self.retry_sequences.append(retry_sequence)
+                self._append_retry_sequence(retry_sequence)
                 self.combined_metrics.successful_retries += 1
 
                 return result
@@ -211,14 +223,13 @@ class EnhancedLLMAgent(RetryManagedLLMAgent, ContextManagedLLMAgent):
 
                 if attempt < self.max_retries - 1:
                     # Not the final attempt, wait and continue
-                    delay = self.retry_delay_base * (2 ** attempt)  # Exponential backoff
-                    time.sleep(delay)
+                    self._sleep(self._retry_delay(attempt))
                     original_error = e  # Update error for next attempt
                 else:
                     # Final attempt failed
                     retry_sequence.final_success = False
                     retry_sequence.total_duration = time.time() - start_time
-                    self.retry_sequences.append(retry_sequence)
+                    self._append_retry_sequence(retry_sequence)
 
                     # Re-raise the final error
                     raise
@@ -278,7 +289,7 @@ class EnhancedLLMAgent(RetryManagedLLMAgent, ContextManagedLLMAgent):
             else:
                 compressed_messages.append(msg)
 
-        modified_state = copy.deepcopy(state)
+        modified_state = copy.copy(state)
         modified_state.messages = compressed_messages
 
         return modified_state
@@ -481,6 +492,6 @@ current state information rather than relying on conversation history.
     def reset_enhanced_metrics(self):
         """Reset all enhanced agent metrics and history."""
         self.combined_metrics = EnhancedPerformanceMetrics()
-        self.reduction_history.clear()
-        self.retry_sequences.clear()
+        self._clear_reduction_history()
+        self._clear_retry_history()
         self.operation_counter = 0
\ No newline at end of file
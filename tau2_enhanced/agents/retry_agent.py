@@ -6,18 +6,163 @@ retry mechanism, addressing the 87% action execution failure rate identified
 in the tau2-bench analysis.
 """
 
+import asyncio
+import random
 import time
 import copy
 import re
-from typing import Any, Dict, List, Optional, Union
+from collections import Counter, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Union
 from dataclasses import dataclass
+from functools import lru_cache
 
 from tau2.agent.llm_agent import LLMAgent
 from tau2.data_model.message import Message, SystemMessage
 from tau2_enhanced.logging import ExecutionLogger
 
+# Most recent retry sequences kept for statistics
+_MAX_RETRY_HISTORY = 1024
+
+# Names of exception types that are usually retryable
+_RETRYABLE_ERROR_TYPES = frozenset({
+    'ValidationError', 'ValueError', 'TypeError',
+    'KeyError', 'AttributeError'
+})
+
+# Error message keywords that mark an error as retryable
+_RETRYABLE_KEYWORDS = (
+    'validation', 'parameter', 'argument', 'format',
+    'type', 'value', 'range', 'choice', 'required'
+)
+
+# Default error message patterns per error type, checked in order
+_ERROR_PATTERN_STRINGS: Dict[str, List[str]] = {
+    'type_mismatch': [
+        r'expected .* got .*',
+        r'invalid type.*expected',
+        r'type.*not supported'
+    ],
+    'missing_parameter': [
+        r'missing required parameter',
+        r'required argument.*missing',
+        r'missing.*required'
+    ],
+    'invalid_format': [
+        r'invalid format',
+        r'format error',
+        r'malformed.*format',
+        r'incorrect format'
+    ],
+    'value_out_of_range': [
+        r'out of range',
+        r'invalid value',
+        r'value.*not allowed',
+        r'exceeds.*limit'
+    ],
+    'enum_violation': [
+        r'not in allowed values',
+        r'invalid choice',
+        r'must be one of',
+        r'unknown.*option'
+    ]
+}
+
+# The default patterns with each type's alternatives compiled into one regex
+_COMPILED_ERROR_PATTERNS: Dict[str, re.Pattern] = {
+    error_type: re.compile('|'.join(patterns))
+    for error_type, patterns in _ERROR_PATTERN_STRINGS.items()
+}
+
+
+@lru_cache(maxsize=256)
+def _classify_error_message(error_message: str) -> Optional[str]:
+    """
+    Classify a lowercased error message against the default error patterns.
+
+    Retries of the same operation usually fail with the same message, so
+    results are cached to skip rescanning every pattern on each attempt.
+
+    Args:
+        error_message: Lowercased error message
+
+    Returns:
+        Matching error type, or None if no pattern matches
+    """
+    for error_type, pattern in _COMPILED_ERROR_PATTERNS.items():
+        if pattern.search(error_message):
+            return error_type
+    return None
+
+
+# Retry guidance message bodies per recovery strategy, filled in with format_map
+_RETRY_GUIDANCE_TEMPLATES: Dict[str, str] = {
+    strategy: template.strip()
+    for strategy, template in {
+        'parameter_completion': """
+Attempt {attempt}/{max_retries} - Parameter Error Recovery:
+The previous tool call failed due to missing required parameters: {error_msg}
+
+Recovery guidance:
+1. Identify all required parameters for the tool
+2. Ensure all required parameters are provided with valid values
+3. Double-check parameter names for typos
+4. Use simpler parameter values if complex ones are failing
+""",
+        'type_correction': """
+Attempt {attempt}/{max_retries} - Type Error Recovery:
+The previous tool call failed due to incorrect parameter types: {error_msg}
+
+Recovery guidance:
+1. Check the expected data types for all parameters
+2. Convert string numbers to integers/floats where needed
+3. Ensure boolean values are true/false, not strings
+4. Use proper list/dict formats for complex parameters
+""",
+        'format_correction': """
+Attempt {attempt}/{max_retries} - Format Error Recovery:
+The previous tool call failed due to incorrect parameter format: {error_msg}
+
+Recovery guidance:
+1. Check the expected format for parameters (e.g., date formats, email formats)
+2. Use standard formats (ISO dates, valid email addresses)
+3. Ensure string parameters don't contain invalid characters
+4. Verify list and dict parameter structures
+""",
+        'value_adjustment': """
+Attempt {attempt}/{max_retries} - Value Error Recovery:
+The previous tool call failed due to invalid parameter values: {error_msg}
+
+Recovery guidance:
+1. Use values within the valid range or set
+2. Check minimum/maximum limits for numeric parameters
+3. Use reasonable default values for optional parameters
+4. Avoid extreme or edge-case values
+""",
+        'enum_correction': """
+Attempt {attempt}/{max_retries} - Choice Error Recovery:
+The previous tool call failed due to invalid parameter choices: {error_msg}
+
+Recovery guidance:
+1. Use only the allowed values for choice parameters
+2. Check for exact spelling and case sensitivity
+3. Review the available options carefully
+4. Use the most appropriate choice from the valid set
+""",
+        'generic_simplification': """
+Attempt {attempt}/{max_retries} - Generic Error Recovery:
+The previous tool call failed: {error_msg}
+
+Recovery guidance:
+1. Simplify the tool call by removing optional parameters
+2. Use basic, safe values for all parameters
+3. Double-check all parameter names and values
+4. Try a more conservative approach to the task
+"""
+    }.items()
+}
+
 
-@dataclass
+@dataclass(slots=True)
 class RetryAttempt:
     """Information about a single retry attempt."""
     attempt_number: int
@@ -29,7 +174,7 @@ class RetryAttempt:
     success: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class RetrySequence:
     """Complete retry sequence for a failed operation."""
     tool_name: str
@@ -56,11 +201,30 @@ class RetryManagedLLMAgent(LLMAgent):
     and applies appropriate recovery strategies with up to 3 retry attempts.
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(
+        self,
+        *args,
+        sleep_fn: Callable[[float], None] = time.sleep,
+        async_sleep_fn: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        **kwargs
+    ):
+        """
+        Initialize the retry-managed agent.
+
+        Args:
+            *args: Positional arguments forwarded to LLMAgent
+            sleep_fn: Function used to wait between retry attempts
+            async_sleep_fn: Coroutine function used to wait between retry
+                attempts in generate_next_message_async
+            **kwargs: Keyword arguments forwarded to LLMAgent
+        """
         super().__init__(*args, **kwargs)
         self.max_retries = 3
         self.retry_delay_base = 0.5  # Base delay in seconds
-        self.retry_sequences: List[RetrySequence] = []
+        self._sleep = sleep_fn
+        self._async_sleep = async_sleep_fn
+        self.retry_sequences: Deque[RetrySequence] = deque(maxlen=_MAX_RETRY_HISTORY)
+        self._reset_retry_totals()
 
         # Initialize execution logger for retry tracking
         self.retry_logger = ExecutionLogger(
@@ -69,37 +233,29 @@ class RetryManagedLLMAgent(LLMAgent):
             console_output=False
         )
 
-        # Error pattern recognition for recovery strategy selection
-        self.error_patterns = {
-            'type_mismatch': [
-                r'expected .* got .*',
-                r'invalid type.*expected',
-                r'type.*not supported'
-            ],
-            'missing_parameter': [
-                r'missing required parameter',
-                r'required argument.*missing',
-                r'missing.*required'
-            ],
-            'invalid_format': [
-                r'invalid format',
-                r'format error',
-                r'malformed.*format',
-                r'incorrect format'
-            ],
-            'value_out_of_range': [
-                r'out of range',
-                r'invalid value',
-                r'value.*not allowed',
-                r'exceeds.*limit'
-            ],
-            'enum_violation': [
-                r'not in allowed values',
-                r'invalid choice',
-                r'must be one of',
-                r'unknown.*option'
-            ]
-        }
+        # Error pattern recognition for recovery strategy selection; None while
+        # the defaults are in use (see the error_patterns property)
+        self._error_patterns: Optional[Dict[str, List[Union[str, re.Pattern]]]] = None
+
+    @property
+    def error_patterns(self) -> Dict[str, List[Union[str, re.Pattern]]]:
+        """
+        Error message patterns per error type, checked in order.
+
+        Starts as a copy of the default patterns. Until it is first read or
+        assigned, classification uses the precompiled defaults; from then on,
+        since the caller may modify it, the dict itself is searched.
+        """
+        if self._error_patterns is None:
+            self._error_patterns = {
+                error_type: list(patterns)
+                for error_type, patterns in _ERROR_PATTERN_STRINGS.items()
+            }
+        return self._error_patterns
+
+    @error_patterns.setter
+    def error_patterns(self, error_patterns: Dict[str, List[Union[str, re.Pattern]]]):
+        self._error_patterns = error_patterns
 
     def generate_next_message(self, message, state):
         """
@@ -128,27 +284,36 @@ class RetryManagedLLMAgent(LLMAgent):
         Returns:
             True if the error can be retried with modifications
         """
-        error_message = str(error).lower()
-        error_type = type(error).__name__
-
-        # Common retryable error patterns
-        retryable_patterns = [
-            'validation', 'parameter', 'argument', 'format',
-            'type', 'value', 'range', 'choice', 'required'
-        ]
+        # Check specific error types that are usually retryable; matching on
+        # the class name also covers ValidationError classes from other libraries
+        if type(error).__name__ in _RETRYABLE_ERROR_TYPES:
+            return True
 
         # Check if error message contains retryable keywords
-        for pattern in retryable_patterns:
-            if pattern in error_message:
-                return True
+        error_message = str(error).lower()
+        return any(keyword in error_message for keyword in _RETRYABLE_KEYWORDS)
 
-        # Check specific error types that are usually retryable
-        retryable_types = [
-            'ValidationError', 'ValueError', 'TypeError',
-            'KeyError', 'AttributeError'
-        ]
+    async def generate_next_message_async(self, message, state):
+        """
+        Async variant of generate_next_message for concurrent simulations.
 
-        return error_type in retryable_types
+        The underlying LLM call runs in a worker thread and the backoff between
+        retries is awaited, so many agents retrying at once share the event
+        loop instead of each blocking a thread for the full delay. The async
+        backoff adds random jitter so that agents which failed together do not
+        all retry at the same moment.
+        """
+        try:
+            return await asyncio.to_thread(
+                super().generate_next_message, message, state
+            )
+        except Exception as e:
+            # Check if this is a retryable validation error
+            if self._is_retryable_error(e):
+                return await self._handle_retry_scenario_async(message, state, e)
+            else:
+                # Re-raise non-retryable errors
+                raise
 
     def _handle_retry_scenario(self, message, state, original_error: Exception):
         """
@@ -162,114 +327,215 @@ class RetryManagedLLMAgent(LLMAgent):
         Returns:
             Result from successful retry or re-raises final error
         """
-        retry_sequence = RetrySequence(
-            tool_name="unknown",  # Will be updated if we can extract it
-            original_args={},
-            attempts=[],
-            final_success=False,
-            total_duration=0,
-            recovery_strategies_used=[]
-        )
-
+        retry_sequence = self._new_retry_sequence()
         start_time = time.time()
 
         for attempt in range(self.max_retries):
+            retry_attempt = self._new_retry_attempt(original_error, attempt)
             try:
-                # Create retry attempt record
-                retry_attempt = RetryAttempt(
-                    attempt_number=attempt + 1,
-                    error_type=type(original_error).__name__,
-                    error_message=str(original_error),
-                    recovery_strategy="",
-                    tool_args_modified={},
-                    timestamp=time.time(),
-                    success=False
+                modified_state = self._prepare_retry_state(
+                    state, original_error, attempt, retry_attempt, retry_sequence
                 )
 
-                # Determine recovery strategy
-                recovery_strategy = self._determine_recovery_strategy(original_error)
-                retry_attempt.recovery_strategy = recovery_strategy
-                retry_sequence.recovery_strategies_used.append(recovery_strategy)
+                # Attempt the operation again
+                result = super().generate_next_message(message, modified_state)
 
-                # Apply recovery strategy to the conversation state
-                modified_state = self._apply_recovery_strategy(
-                    state, original_error, recovery_strategy, attempt
+                self._record_retry_success(
+                    retry_sequence, retry_attempt, original_error, attempt, start_time
                 )
+                return result
 
-                # Add retry guidance message to conversation
-                retry_guidance = self._create_retry_guidance_message(
-                    original_error, recovery_strategy, attempt + 1
-                )
-                modified_state.messages.append(retry_guidance)
-
-                # Log retry attempt
-                self.retry_logger.log_context_reduction(
-                    original_tokens=len(state.messages),
-                    reduced_tokens=len(modified_state.messages),
-                    strategy_used=f"retry_guidance_{recovery_strategy}",
-                    trigger_reason="retry_failure_recovery"
+            except Exception as e:
+                # This attempt failed
+                self._record_failed_attempt(retry_sequence, retry_attempt, e)
+
+                if attempt < self.max_retries - 1:
+                    # Not the final attempt, wait and continue
+                    self._sleep(self._retry_delay(attempt))
+                    original_error = e  # Update error for next attempt
+                else:
+                    self._record_retry_failure(retry_sequence, original_error, e, start_time)
+
+                    # Re-raise the final error
+                    raise
+
+    async def _handle_retry_scenario_async(self, message, state, original_error: Exception):
+        """
+        Async counterpart of _handle_retry_scenario.
+
+        Args:
+            message: Original message that caused the error
+            state: Current conversation state
+            original_error: The error that triggered the retry
+
+        Returns:
+            Result from successful retry or re-raises final error
+        """
+        retry_sequence = self._new_retry_sequence()
+        start_time = time.time()
+
+        for attempt in range(self.max_retries):
+            retry_attempt = self._new_retry_attempt(original_error, attempt)
+            try:
+                modified_state = self._prepare_retry_state(
+                    state, original_error, attempt, retry_attempt, retry_sequence
                 )
 
                 # Attempt the operation again
-                result = super().generate_next_message(message, modified_state)
-
-                # Success! Record and return
-                retry_attempt.success = True
-                retry_sequence.attempts.append(retry_attempt)
-                retry_sequence.final_success = True
-                retry_sequence.total_duration = time.time() - start_time
-
-                self.retry_sequences.append(retry_sequence)
-
-                # Log successful retry
-                self.retry_logger.log_tool_execution(
-                    tool_name=f"retry_recovery_{attempt + 1}",
-                    success=True,
-                    execution_time=retry_sequence.total_duration,
-                    tool_args={
-                        "original_error": str(original_error),
-                        "recovery_strategy": recovery_strategy,
-                        "attempts": attempt + 1
-                    },
-                    result={"retry_success": True, "final_attempt": attempt + 1}
+                result = await asyncio.to_thread(
+                    super().generate_next_message, message, modified_state
                 )
 
+                self._record_retry_success(
+                    retry_sequence, retry_attempt, original_error, attempt, start_time
+                )
                 return result
 
             except Exception as e:
                 # This attempt failed
-                retry_attempt.error_message = str(e)
-                retry_attempt.error_type = type(e).__name__
-                retry_sequence.attempts.append(retry_attempt)
+                self._record_failed_attempt(retry_sequence, retry_attempt, e)
 
                 if attempt < self.max_retries - 1:
-                    # Not the final attempt, wait and continue
-                    delay = self.retry_delay_base * (2 ** attempt)  # Exponential backoff
-                    time.sleep(delay)
+                    # Not the final attempt, yield to other agents while waiting
+                    await self._async_sleep(self._retry_delay(attempt, jitter=True))
                     original_error = e  # Update error for next attempt
                 else:
-                    # Final attempt failed
-                    retry_sequence.final_success = False
-                    retry_sequence.total_duration = time.time() - start_time
-                    self.retry_sequences.append(retry_sequence)
-
-                    # Log final failure
-                    self.retry_logger.log_tool_execution(
-                        tool_name=f"retry_failure_final",
-                        success=False,
-                        execution_time=retry_sequence.total_duration,
-                        tool_args={
-                            "original_error": str(original_error),
-                            "strategies_tried": retry_sequence.recovery_strategies_used,
-                            "total_attempts": self.max_retries
-                        },
-                        error_message=str(e),
-                        error_type=type(e).__name__
-                    )
+                    self._record_retry_failure(retry_sequence, original_error, e, start_time)
 
                     # Re-raise the final error
                     raise
 
+    def _retry_delay(self, attempt: int, jitter: bool = False) -> float:
+        """
+        Compute the exponential backoff before the next retry attempt.
+
+        Args:
+            attempt: Attempt that just failed (0-indexed)
+            jitter: Whether to add up to retry_delay_base of random jitter
+
+        Returns:
+            Delay in seconds
+        """
+        delay = self.retry_delay_base * (2 ** attempt)
+        if jitter:
+            delay += random.uniform(0, self.retry_delay_base)
+        return delay
+
+    def _new_retry_sequence(self) -> RetrySequence:
+        """Create an empty retry sequence record."""
+        return RetrySequence(
+            tool_name="unknown",  # Will be updated if we can extract it
+            original_args={},
+            attempts=[],
+            final_success=False,
+            total_duration=0,
+            recovery_strategies_used=[]
+        )
+
+    def _new_retry_attempt(self, error: Exception, attempt: int) -> RetryAttempt:
+        """Create the record for a retry attempt triggered by an error."""
+        return RetryAttempt(
+            attempt_number=attempt + 1,
+            error_type=type(error).__name__,
+            error_message=str(error),
+            recovery_strategy="",
+            tool_args_modified={},
+            timestamp=time.time(),
+            success=False
+        )
+
+    def _prepare_retry_state(self, state, error: Exception, attempt: int,
+                             retry_attempt: RetryAttempt, retry_sequence: RetrySequence):
+        """
+        Build the conversation state for a retry attempt.
+
+        Args:
+            state: Current conversation state
+            error: The error being recovered from
+            attempt: Current attempt number (0-indexed)
+            retry_attempt: Record of this attempt
+            retry_sequence: Record of the whole retry sequence
+
+        Returns:
+            Modified state with the recovery strategy and guidance applied
+        """
+        # Determine recovery strategy
+        recovery_strategy = self._determine_recovery_strategy(error)
+        retry_attempt.recovery_strategy = recovery_strategy
+        retry_sequence.recovery_strategies_used.append(recovery_strategy)
+
+        # Apply recovery strategy to the conversation state
+        modified_state = self._apply_recovery_strategy(
+            state, error, recovery_strategy, attempt
+        )
+
+        # Add retry guidance message to conversation
+        retry_guidance = self._create_retry_guidance_message(
+            error, recovery_strategy, attempt + 1
+        )
+        modified_state.messages.append(retry_guidance)
+
+        # Log retry attempt
+        self.retry_logger.log_context_reduction(
+            original_tokens=len(state.messages),
+            reduced_tokens=len(modified_state.messages),
+            strategy_used=f"retry_guidance_{recovery_strategy}",
+            trigger_reason="retry_failure_recovery"
+        )
+
+        return modified_state
+
+    def _record_retry_success(self, retry_sequence: RetrySequence, retry_attempt: RetryAttempt,
+                              original_error: Exception, attempt: int, start_time: float):
+        """Record and log a retry sequence that ended in success."""
+        retry_attempt.success = True
+        retry_sequence.attempts.append(retry_attempt)
+        retry_sequence.final_success = True
+        retry_sequence.total_duration = time.time() - start_time
+
+        self._append_retry_sequence(retry_sequence)
+
+        # Log successful retry
+        self.retry_logger.log_tool_execution(
+            tool_name=f"retry_recovery_{attempt + 1}",
+            success=True,
+            execution_time=retry_sequence.total_duration,
+            tool_args={
+                "original_error": str(original_error),
+                "recovery_strategy": retry_attempt.recovery_strategy,
+                "attempts": attempt + 1
+            },
+            result={"retry_success": True, "final_attempt": attempt + 1}
+        )
+
+    def _record_failed_attempt(self, retry_sequence: RetrySequence,
+                               retry_attempt: RetryAttempt, error: Exception):
+        """Record a single retry attempt that raised an error."""
+        retry_attempt.error_message = str(error)
+        retry_attempt.error_type = type(error).__name__
+        retry_sequence.attempts.append(retry_attempt)
+
+    def _record_retry_failure(self, retry_sequence: RetrySequence, original_error: Exception,
+                              final_error: Exception, start_time: float):
+        """Record and log a retry sequence that exhausted all attempts."""
+        retry_sequence.final_success = False
+        retry_sequence.total_duration = time.time() - start_time
+        self._append_retry_sequence(retry_sequence)
+
+        # Log final failure
+        self.retry_logger.log_tool_execution(
+            tool_name=f"retry_failure_final",
+            success=False,
+            execution_time=retry_sequence.total_duration,
+            tool_args={
+                "original_error": str(original_error),
+                "strategies_tried": retry_sequence.recovery_strategies_used,
+                "total_attempts": self.max_retries
+            },
+            error_message=str(final_error),
+            error_type=type(final_error).__name__
+        )
+
     def _determine_recovery_strategy(self, error: Exception) -> str:
         """
         Determine the best recovery strategy based on the error type and message.
@@ -282,11 +548,22 @@ class RetryManagedLLMAgent(LLMAgent):
         """
         error_message = str(error).lower()
 
-        # Check error patterns to classify the error type
-        for error_type, patterns in self.error_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, error_message):
-                    return self._get_strategy_for_error_type(error_type)
+        # Check error patterns to classify the error type; untouched defaults
+        # go through the precompiled, cached classifier
+        error_patterns = self._error_patterns
+        if error_patterns is None:
+            error_type = _classify_error_message(error_message)
+            if error_type is not None:
+                return self._get_strategy_for_error_type(error_type)
+        else:
+            for error_type, patterns in error_patterns.items():
+                # Accept a single pattern as well as a list; re.search takes
+                # both pattern strings and compiled patterns
+                if isinstance(patterns, (str, re.Pattern)):
+                    patterns = (patterns,)
+                for pattern in patterns:
+                    if re.search(pattern, error_message):
+                        return self._get_strategy_for_error_type(error_type)
 
         # Fallback strategy
         return 'generic_simplification'
@@ -324,8 +601,10 @@ class RetryManagedLLMAgent(LLMAgent):
         Returns:
             Modified conversation state
         """
-        # Create a copy of the state to modify
-        modified_state = copy.deepcopy(state)
+        # Copy the state and its message list; guidance is appended to the
+        # list, while the messages themselves are shared with the original
+        modified_state = copy.copy(state)
+        modified_state.messages = list(state.messages)
 
         # Apply strategy-specific modifications
         if strategy == 'parameter_completion':
@@ -384,82 +663,68 @@ class RetryManagedLLMAgent(LLMAgent):
         Returns:
             System message with retry guidance
         """
-        error_msg = str(error)
-
-        guidance_templates = {
-            'parameter_completion': f"""
-Attempt {attempt}/3 - Parameter Error Recovery:
-The previous tool call failed due to missing required parameters: {error_msg}
-
-Recovery guidance:
-1. Identify all required parameters for the tool
-2. Ensure all required parameters are provided with valid values
-3. Double-check parameter names for typos
-4. Use simpler parameter values if complex ones are failing
-""",
-            'type_correction': f"""
-Attempt {attempt}/3 - Type Error Recovery:
-The previous tool call failed due to incorrect parameter types: {error_msg}
-
-Recovery guidance:
-1. Check the expected data types for all parameters
-2. Convert string numbers to integers/floats where needed
-3. Ensure boolean values are true/false, not strings
-4. Use proper list/dict formats for complex parameters
-""",
-            'format_correction': f"""
-Attempt {attempt}/3 - Format Error Recovery:
-The previous tool call failed due to incorrect parameter format: {error_msg}
-
-Recovery guidance:
-1. Check the expected format for parameters (e.g., date formats, email formats)
-2. Use standard formats (ISO dates, valid email addresses)
-3. Ensure string parameters don't contain invalid characters
-4. Verify list and dict parameter structures
-""",
-            'value_adjustment': f"""
-Attempt {attempt}/3 - Value Error Recovery:
-The previous tool call failed due to invalid parameter values: {error_msg}
-
-Recovery guidance:
-1. Use values within the valid range or set
-2. Check minimum/maximum limits for numeric parameters
-3. Use reasonable default values for optional parameters
-4. Avoid extreme or edge-case values
-""",
-            'enum_correction': f"""
-Attempt {attempt}/3 - Choice Error Recovery:
-The previous tool call failed due to invalid parameter choices: {error_msg}
-
-Recovery guidance:
-1. Use only the allowed values for choice parameters
-2. Check for exact spelling and case sensitivity
-3. Review the available options carefully
-4. Use the most appropriate choice from the valid set
-""",
-            'generic_simplification': f"""
-Attempt {attempt}/3 - Generic Error Recovery:
-The previous tool call failed: {error_msg}
-
-Recovery guidance:
-1. Simplify the tool call by removing optional parameters
-2. Use basic, safe values for all parameters
-3. Double-check all parameter names and values
-4. Try a more conservative approach to the task
-"""
-        }
-
-        guidance = guidance_templates.get(strategy, guidance_templates['generic_simplification'])
+        template = _RETRY_GUIDANCE_TEMPLATES.get(
+            strategy, _RETRY_GUIDANCE_TEMPLATES['generic_simplification']
+        )
+        guidance = template.format_map({
+            'attempt': attempt,
+            'max_retries': self.max_retries,
+            'error_msg': str(error)
+        })
 
         return SystemMessage(
             role="system",
-            content=guidance.strip()
+            content=guidance
         )
 
+    def _append_retry_sequence(self, retry_sequence: RetrySequence):
+        """
+        Add a finished retry sequence to the history and the running totals.
+
+        When the history is full, the evicted sequence is subtracted from the
+        totals so they always describe exactly what retry_sequences holds.
+
+        Args:
+            retry_sequence: Completed retry sequence
+        """
+        if len(self.retry_sequences) == self.retry_sequences.maxlen:
+            self._update_retry_totals(self.retry_sequences[0], -1)
+        self.retry_sequences.append(retry_sequence)
+        self._update_retry_totals(retry_sequence, 1)
+
+    def _update_retry_totals(self, retry_sequence: RetrySequence, sign: int):
+        """Add (sign=1) or remove (sign=-1) a sequence from the running totals."""
+        totals = self._retry_totals
+        totals['successes'] += sign * retry_sequence.final_success
+        totals['attempts'] += sign * len(retry_sequence.attempts)
+        totals['time'] += sign * retry_sequence.total_duration
+
+        for strategy in retry_sequence.recovery_strategies_used:
+            self._strategy_used[strategy] += sign
+            if retry_sequence.final_success:
+                self._strategy_successes[strategy] += sign
+        for attempt in retry_sequence.attempts:
+            self._error_type_counts[attempt.error_type] += sign
+
+    def _reset_retry_totals(self):
+        """Reset the running totals behind get_retry_statistics."""
+        self._retry_totals = {'successes': 0, 'attempts': 0, 'time': 0.0}
+        self._strategy_used: Counter = Counter()
+        self._strategy_successes: Counter = Counter()
+        self._error_type_counts: Counter = Counter()
+
+    def _clear_retry_history(self):
+        """Clear the retry history and its running statistics."""
+        self.retry_sequences.clear()
+        self._reset_retry_totals()
+
     def get_retry_statistics(self) -> Dict[str, Any]:
         """
         Get comprehensive statistics about retry attempts.
 
+        Statistics cover the most recent retry sequences still held in
+        retry_sequences (up to _MAX_RETRY_HISTORY).
+
         Returns:
             Dictionary with retry performance metrics
         """
@@ -472,38 +737,29 @@ Recovery guidance:
                 'strategy_effectiveness': {}
             }
 
-        successful_sequences = [seq for seq in self.retry_sequences if seq.final_success]
-        total_attempts = sum(len(seq.attempts) for seq in self.retry_sequences)
-        total_time = sum(seq.total_duration for seq in self.retry_sequences)
+        total_sequences = len(self.retry_sequences)
+        totals = self._retry_totals
 
         # Strategy effectiveness analysis
-        strategy_stats = {}
-        for seq in self.retry_sequences:
-            for strategy in seq.recovery_strategies_used:
-                if strategy not in strategy_stats:
-                    strategy_stats[strategy] = {'used': 0, 'successful': 0}
-                strategy_stats[strategy]['used'] += 1
-                if seq.final_success:
-                    strategy_stats[strategy]['successful'] += 1
-
-        # Calculate effectiveness rates
         strategy_effectiveness = {}
-        for strategy, stats in strategy_stats.items():
-            effectiveness = stats['successful'] / stats['used'] if stats['used'] > 0 else 0
+        for strategy, used in self._strategy_used.items():
+            if used <= 0:
+                continue  # Only used by sequences evicted from the history
+            successful = self._strategy_successes[strategy]
             strategy_effectiveness[strategy] = {
-                'success_rate': effectiveness,
-                'times_used': stats['used'],
-                'successful_recoveries': stats['successful']
+                'success_rate': successful / used,
+                'times_used': used,
+                'successful_recoveries': successful
             }
 
         return {
-            'total_retry_sequences': len(self.retry_sequences),
-            'successful_sequences': len(successful_sequences),
-            'success_rate': len(successful_sequences) / len(self.retry_sequences),
-            'average_attempts': total_attempts / len(self.retry_sequences),
-            'total_time_spent': total_time,
+            'total_retry_sequences': total_sequences,
+            'successful_sequences': totals['successes'],
+            'success_rate': totals['successes'] / total_sequences,
+            'average_attempts': totals['attempts'] / total_sequences,
+            'total_time_spent': totals['time'],
             'strategy_effectiveness': strategy_effectiveness,
-            'error_types_encountered': list(set(
-                attempt.error_type for seq in self.retry_sequences for attempt in seq.attempts
-            ))
+            'error_types_encountered': [
+                error_type for error_type, count in self._error_type_counts.items() if count > 0
+            ]
         }
\ No newline at end of file
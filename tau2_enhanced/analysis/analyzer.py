@@ -55,7 +55,8 @@ class LogAnalyzer:
             A pandas DataFrame optimized for analysis operations.
         """
         # Detect if this is a https://github.com/jitrc/tau2-bench/tree/xai log format
-        if  isinstance(log_data, dict) and 'simulations' in log_data and isinstance(log_data['simulations'], list) and len(log_data['simulations']) > 0 and 'enhanced_logging_enabled' in log_data['simulations'][0]:
+        simulations = log_data.get('simulations') if isinstance(log_data, dict) else None
+        if isinstance(simulations, list) and simulations and 'enhanced_logging_enabled' in simulations[0]:
             self.tool_events = self._parse_jit_log_data(log_data)
 
         # Existing logic for enhanced logs
@@ -118,8 +119,9 @@ class LogAnalyzer:
             sim_iterator = sim_iterator.values()
 
         for sim in sim_iterator:
-            if 'execution_logs' in sim and sim['execution_logs'] is not None:
-                for log in sim['execution_logs']:
+            execution_logs = sim.get('execution_logs')
+            if execution_logs is not None:
+                for log in execution_logs:
                     tool_args = log.get('arguments', {})
                     if not isinstance(tool_args, dict):
                         tool_args = {}
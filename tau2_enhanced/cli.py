@@ -46,17 +46,37 @@ def print_error(text: str):
     """Print error message."""
     print(f"{Colors.FAIL}❌ {text}{Colors.ENDC}")
 
+_BAR_LENGTH = 30
+_FULL_BAR = '█' * _BAR_LENGTH
+_EMPTY_BAR = '-' * _BAR_LENGTH
+
+
 def print_progress(current: int, total: int, desc: str = "Progress"):
-    """Print a simple progress indicator."""
+    """
+    Print a simple progress indicator.
+
+    The bar is only redrawn when its filled length changes, and nothing is
+    written when stdout is not a terminal (e.g. piped or redirected runs).
+    """
+    if not sys.stdout.isatty():
+        return
+
+    filled_length = int(_BAR_LENGTH * current // total) if total > 0 else 0
+    complete = current == total
+    if filled_length == print_progress._last and not complete:
+        return
+    print_progress._last = -1 if complete else filled_length
+
     percentage = (current / total) * 100 if total > 0 else 0
-    bar_length = 30
-    filled_length = int(bar_length * current // total) if total > 0 else 0
-    bar = '█' * filled_length + '-' * (bar_length - filled_length)
+    bar = _FULL_BAR[:filled_length] + _EMPTY_BAR[filled_length:]
     print(f"\r🔄 {desc}: |{bar}| {percentage:.1f}% ({current}/{total})", end='', flush=True)
-    if current == total:
+    if complete:
         print()  # New line when complete
 
 
+print_progress._last = -1
+
+
 def create_enhanced_parser():
     """Create argument parser for enhanced tau2 CLI."""
     parser = argparse.ArgumentParser(description="tau2-enhanced: Enhanced tau2-bench with detailed logging")
@@ -311,10 +331,14 @@ def enhanced_main(cli_args: Optional[List[str]] = None):
         enhanced_count = 1 if total_exec_logs > 0 or total_state_snaps > 0 else 0
 
         # Calculate some basic statistics
-        total_sims = len(results.simulations)
+        simulations = results.simulations
+        total_sims = len(simulations)
         # Compute success based on reward_info (tau2-bench doesn't have a direct 'success' field)
-        successful_sims = sum(1 for sim in results.simulations
-                             if sim.reward_info and sim.reward_info.reward and sim.reward_info.reward > 0)
+        successful_sims = 0
+        for sim in simulations:
+            reward_info = sim.reward_info
+            if reward_info is not None and (reward := reward_info.reward) and reward > 0:
+                successful_sims += 1
         success_rate = (successful_sims / total_sims * 100) if total_sims > 0 else 0
 
         print(f"\n{Colors.UNDERLINE}📈 Enhanced Logging Summary:{Colors.ENDC}")
@@ -5,16 +5,143 @@ This module provides automatic registration of enhanced domains that wrap
 original tau2 domains with LoggingEnvironment for detailed logging capabilities.
 """
 
-from typing import Optional, Dict, Any, Callable
+import importlib
+import importlib.util
+from operator import attrgetter
+from collections.abc import Callable, Collection, Iterable
+from typing import Any
 from loguru import logger
 
 from tau2.registry import registry
 from tau2_enhanced.environments.logging_environment import LoggingEnvironment
 
 
+# Accessors for the fields copied from an original environment into LoggingEnvironment
+_get_env_fields = attrgetter('domain_name', 'policy', 'tools', 'user_tools')
+_get_base_env_fields = attrgetter('domain_name', 'policy', 'tools')
+
+
+def _get_env_fields_without_user_tools(env: Any) -> tuple:
+    """Fetch environment fields for environments that have no user tools."""
+    return (*_get_base_env_fields(env), None)
+
+
+class _LazyCallable:
+    """Callable proxy that imports its target on first call."""
+
+    __slots__ = ('_module_name', '_attr_name', '_target')
+
+    def __init__(self, module_name: str, attr_name: str):
+        self._module_name = module_name
+        self._attr_name = attr_name
+        self._target: Callable | None = None
+
+    def __call__(self, *args, **kwargs):
+        target = self._target
+        if target is None:
+            module = importlib.import_module(self._module_name)
+            target = self._target = getattr(module, self._attr_name)
+        return target(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"lazy_import('{self._module_name}.{self._attr_name}')"
+
+
+def lazy_import(path: str) -> Callable:
+    """
+    Create a callable that resolves a dotted 'module.attribute' path on first call.
+
+    Args:
+        path: Dotted path to a callable, e.g. 'tau2.domains.airline.environment.get_tasks'
+
+    Returns:
+        Proxy that imports the module and delegates to the attribute when called
+    """
+    module_name, _, attr_name = path.rpartition('.')
+    return _LazyCallable(module_name, attr_name)
+
+
+def _lazy_domain_constructors(
+    module_name: str,
+    environment_attr: str = 'get_environment',
+    tasks_attr: str = 'get_tasks'
+) -> dict[str, Callable] | None:
+    """Build lazy constructors for a domain module without importing it."""
+    try:
+        if importlib.util.find_spec(module_name) is None:
+            return None
+    except ImportError:
+        return None
+    return {
+        'get_environment': lazy_import(f"{module_name}.{environment_attr}"),
+        'get_tasks': lazy_import(f"{module_name}.{tasks_attr}")
+    }
+
+
+def _registered_names(
+    internal_attr: str,
+    public_getter: Callable[[], Iterable[str]]
+) -> Collection[str]:
+    """
+    Get names registered in the tau2 registry for membership checks.
+
+    Prefers a live keys view of the registry's internal dict (O(1) lookups,
+    no copy, always current) and falls back to a set snapshot of the public
+    getter when the internal attribute is unavailable.
+    """
+    names = getattr(registry, internal_attr, None)
+    if isinstance(names, dict):
+        return names.keys()
+    return set(public_getter())
+
+
+def _mark_registered(names: Collection[str], name: str) -> None:
+    """Record a new registration in a snapshot from _registered_names."""
+    if isinstance(names, set):
+        names.add(name)
+
+
+# Agent tools of each domain known never to modify the database; calls to
+# them skip hashing the database (see LoggingEnvironment.read_only_tools)
+_AIRLINE_READ_ONLY_TOOLS = frozenset({
+    'calculate',
+    'think',
+    'get_user_details',
+    'get_reservation_details',
+    'list_all_airports',
+    'search_direct_flight',
+    'search_onestop_flight',
+})
+_RETAIL_READ_ONLY_TOOLS = frozenset({
+    'calculate',
+    'think',
+    'find_user_id_by_email',
+    'find_user_id_by_name_zip',
+    'get_order_details',
+    'get_product_details',
+    'get_user_details',
+    'list_all_product_types',
+})
+
+# Known tau2 domains: (domain name, environment module, environment constructor,
+# tasks getter, read-only agent tools)
+_DOMAIN_SPECS = (
+    ('airline', 'tau2.domains.airline.environment', 'get_environment', 'get_tasks',
+     _AIRLINE_READ_ONLY_TOOLS),
+    ('retail', 'tau2.domains.retail.environment', 'get_environment', 'get_tasks',
+     _RETAIL_READ_ONLY_TOOLS),
+    ('telecom', 'tau2.domains.telecom.environment', 'get_environment_manual_policy', 'get_tasks',
+     frozenset()),
+    ('mock', 'tau2.domains.mock.environment', 'get_environment', 'get_tasks',
+     frozenset()),
+)
+
+
 class EnhancedDomainRegistry:
     """Registry for enhanced domain variants with automatic discovery."""
 
+    __slots__ = ('_enhanced_domains', '_original_constructors')
+
     def __init__(self):
         self._enhanced_domains = {}
         self._original_constructors = {}
@@ -23,9 +150,12 @@ class EnhancedDomainRegistry:
         self,
         domain_name: str,
         original_get_environment: Callable,
-        original_get_tasks: Optional[Callable] = None,
-        enhanced_suffix: str = "_enhanced"
-    ) -> None:
+        original_get_tasks: Callable | None = None,
+        enhanced_suffix: str = "_enhanced",
+        existing_domains: Collection[str] | None = None,
+        existing_task_sets: Collection[str] | None = None,
+        read_only_tools: Iterable[str] | None = None
+    ) -> str:
         """
         Register an enhanced version of a domain.
 
@@ -34,24 +164,46 @@ class EnhancedDomainRegistry:
             original_get_environment: Original domain environment constructor
             original_get_tasks: Original domain tasks getter (optional)
             enhanced_suffix: Suffix for enhanced domain name
+            existing_domains: Registered domain names (see _registered_names);
+                queried from the tau2 registry if not provided
+            existing_task_sets: Registered task set names (see _registered_names);
+                queried from the tau2 registry if not provided
+            read_only_tools: Names of the domain's agent tools that never modify
+                its database, passed to each LoggingEnvironment
+
+        Returns:
+            The enhanced domain name
         """
         enhanced_domain_name = f"{domain_name}{enhanced_suffix}"
+        read_only_tools = frozenset(read_only_tools or ())
+
+        # Field accessor for this domain's environments, resolved on first construction
+        env_fields_getter: Callable[[Any], tuple] | None = None
 
         def get_enhanced_environment(*args, **kwargs) -> LoggingEnvironment:
             """Create enhanced environment wrapper."""
+            nonlocal env_fields_getter
             try:
                 # Get the original environment
                 original_env = original_get_environment(*args, **kwargs)
 
+                if env_fields_getter is None:
+                    env_fields_getter = (
+                        _get_env_fields if hasattr(original_env, 'user_tools')
+                        else _get_env_fields_without_user_tools
+                    )
+                env_domain_name, policy, tools, user_tools = env_fields_getter(original_env)
+
                 # Wrap with LoggingEnvironment
                 enhanced_env = LoggingEnvironment(
-                    domain_name=original_env.domain_name,
-                    policy=original_env.policy,
-                    tools=original_env.tools,
-                    user_tools=getattr(original_env, 'user_tools', None)
+                    domain_name=env_domain_name,
+                    policy=policy,
+                    tools=tools,
+                    user_tools=user_tools,
+                    read_only_tools=read_only_tools
                 )
 
-                logger.debug(f"Created enhanced environment for domain '{domain_name}'")
+                logger.debug("Created enhanced environment for domain '{}'", domain_name)
                 return enhanced_env
 
             except Exception as e:
@@ -59,17 +211,25 @@ class EnhancedDomainRegistry:
                 raise
 
         try:
+            if existing_domains is None:
+                existing_domains = _registered_names('_domains', registry.get_domains)
+
             # Check if already registered to avoid double registration
-            if enhanced_domain_name not in registry.get_domains():
+            if enhanced_domain_name not in existing_domains:
                 # Register enhanced domain
                 registry.register_domain(get_enhanced_environment, enhanced_domain_name)
+                _mark_registered(existing_domains, enhanced_domain_name)
                 logger.info(f"Registered enhanced domain: {enhanced_domain_name}")
             else:
                 logger.debug(f"Enhanced domain {enhanced_domain_name} already registered, skipping")
 
+            if original_get_tasks and existing_task_sets is None:
+                existing_task_sets = _registered_names('_tasks', registry.get_task_sets)
+
             # Register tasks if provided
-            if original_get_tasks and enhanced_domain_name not in registry.get_task_sets():
+            if original_get_tasks and enhanced_domain_name not in existing_task_sets:
                 registry.register_tasks(original_get_tasks, enhanced_domain_name)
+                _mark_registered(existing_task_sets, enhanced_domain_name)
                 logger.info(f"Registered enhanced tasks: {enhanced_domain_name}")
             elif original_get_tasks:
                 logger.debug(f"Enhanced tasks {enhanced_domain_name} already registered, skipping")
@@ -79,15 +239,17 @@ class EnhancedDomainRegistry:
                 'original_domain': domain_name,
                 'enhanced_constructor': get_enhanced_environment,
                 'original_constructor': original_get_environment,
-                'tasks_getter': original_get_tasks
+                'tasks_getter': original_get_tasks,
+                'read_only_tools': read_only_tools
             }
             self._original_constructors[domain_name] = original_get_environment
+            return enhanced_domain_name
 
         except Exception as e:
             logger.error(f"Failed to register enhanced domain {enhanced_domain_name}: {e}")
             raise
 
-    def register_all_available_domains(self) -> Dict[str, str]:
+    def register_all_available_domains(self) -> dict[str, str]:
         """
         Automatically discover and register enhanced versions of all available domains.
 
@@ -96,28 +258,26 @@ class EnhancedDomainRegistry:
         """
         registered_domains = {}
 
-        # Import domain constructors with error handling
-        domain_imports = {
-            'airline': self._import_airline_domain,
-            'retail': self._import_retail_domain,
-            'telecom': self._import_telecom_domain,
-            'mock': self._import_mock_domain
-        }
+        # Resolve registry membership once instead of re-querying per domain
+        existing_domains = _registered_names('_domains', registry.get_domains)
+        existing_task_sets = _registered_names('_tasks', registry.get_task_sets)
 
-        for domain_name, import_func in domain_imports.items():
+        # Resolve domain constructors lazily; domain packages are imported on first use
+        for domain_name, module_name, environment_attr, tasks_attr, read_only_tools in _DOMAIN_SPECS:
             try:
-                constructors = import_func()
-                if constructors:
-                    get_environment = constructors.get('get_environment')
-                    get_tasks = constructors.get('get_tasks')
-
-                    if get_environment:
-                        self.register_enhanced_domain(
-                            domain_name=domain_name,
-                            original_get_environment=get_environment,
-                            original_get_tasks=get_tasks
-                        )
-                        registered_domains[domain_name] = f"{domain_name}_enhanced"
+                constructors = _lazy_domain_constructors(module_name, environment_attr, tasks_attr)
+                if constructors is None:
+                    logger.warning(f"Could not find {domain_name} domain")
+                    continue
+
+                registered_domains[domain_name] = self.register_enhanced_domain(
+                    domain_name=domain_name,
+                    original_get_environment=constructors['get_environment'],
+                    original_get_tasks=constructors['get_tasks'],
+                    existing_domains=existing_domains,
+                    existing_task_sets=existing_task_sets,
+                    read_only_tools=read_only_tools
+                )
 
             except Exception as e:
                 logger.warning(f"Could not register enhanced domain for {domain_name}: {e}")
@@ -126,46 +286,7 @@ class EnhancedDomainRegistry:
         logger.info(f"Successfully registered {len(registered_domains)} enhanced domains: {list(registered_domains.values())}")
         return registered_domains
 
-    def _import_airline_domain(self) -> Optional[Dict[str, Callable]]:
-        """Import airline domain constructors."""
-        try:
-            from tau2.domains.airline.environment import get_environment, get_tasks
-            return {'get_environment': get_environment, 'get_tasks': get_tasks}
-        except ImportError as e:
-            logger.warning(f"Could not import airline domain: {e}")
-            return None
-
-    def _import_retail_domain(self) -> Optional[Dict[str, Callable]]:
-        """Import retail domain constructors."""
-        try:
-            from tau2.domains.retail.environment import get_environment, get_tasks
-            return {'get_environment': get_environment, 'get_tasks': get_tasks}
-        except ImportError as e:
-            logger.warning(f"Could not import retail domain: {e}")
-            return None
-
-    def _import_telecom_domain(self) -> Optional[Dict[str, Callable]]:
-        """Import telecom domain constructors."""
-        try:
-            from tau2.domains.telecom.environment import (
-                get_environment_manual_policy as get_environment,
-                get_tasks
-            )
-            return {'get_environment': get_environment, 'get_tasks': get_tasks}
-        except ImportError as e:
-            logger.warning(f"Could not import telecom domain: {e}")
-            return None
-
-    def _import_mock_domain(self) -> Optional[Dict[str, Callable]]:
-        """Import mock domain constructors."""
-        try:
-            from tau2.domains.mock.environment import get_environment, get_tasks
-            return {'get_environment': get_environment, 'get_tasks': get_tasks}
-        except ImportError as e:
-            logger.warning(f"Could not import mock domain: {e}")
-            return None
-
-    def get_enhanced_domains(self) -> Dict[str, Dict[str, Any]]:
+    def get_enhanced_domains(self) -> dict[str, dict[str, Any]]:
         """Get information about all registered enhanced domains."""
         return self._enhanced_domains.copy()
 
@@ -173,7 +294,7 @@ class EnhancedDomainRegistry:
         """Check if a domain name is an enhanced domain."""
         return domain_name in self._enhanced_domains
 
-    def get_original_domain_name(self, enhanced_domain_name: str) -> Optional[str]:
+    def get_original_domain_name(self, enhanced_domain_name: str) -> str | None:
         """Get the original domain name for an enhanced domain."""
         domain_info = self._enhanced_domains.get(enhanced_domain_name)
         return domain_info['original_domain'] if domain_info else None
@@ -183,7 +304,7 @@ class EnhancedDomainRegistry:
 enhanced_domain_registry = EnhancedDomainRegistry()
 
 
-def register_all_enhanced_domains() -> Dict[str, str]:
+def register_all_enhanced_domains() -> dict[str, str]:
     """
     Convenience function to register all available enhanced domains.
 
@@ -196,8 +317,9 @@ def register_all_enhanced_domains() -> Dict[str, str]:
 def register_enhanced_domain(
     domain_name: str,
     original_get_environment: Callable,
-    original_get_tasks: Optional[Callable] = None
-) -> None:
+    original_get_tasks: Callable | None = None,
+    read_only_tools: Iterable[str] | None = None
+) -> str:
     """
     Convenience function to register a single enhanced domain.
 
@@ -205,15 +327,21 @@ def register_enhanced_domain(
         domain_name: Original domain name
         original_get_environment: Original environment constructor
         original_get_tasks: Original tasks getter (optional)
+        read_only_tools: Names of agent tools that never modify the domain's
+            database (optional)
+
+    Returns:
+        The enhanced domain name
     """
-    enhanced_domain_registry.register_enhanced_domain(
+    return enhanced_domain_registry.register_enhanced_domain(
         domain_name=domain_name,
         original_get_environment=original_get_environment,
-        original_get_tasks=original_get_tasks
+        original_get_tasks=original_get_tasks,
+        read_only_tools=read_only_tools
     )
 
 
-def get_enhanced_domains_info() -> Dict[str, Dict[str, Any]]:
+def get_enhanced_domains_info() -> dict[str, dict[str, Any]]:
     """Get information about all registered enhanced domains."""
     return enhanced_domain_registry.get_enhanced_domains()
 
@@ -1,20 +1,101 @@
 """Enhanced runner that wraps tau2-bench run_tasks with logging capture."""
 
-import os
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-import json
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
 from loguru import logger
 
 from tau2.data_model.simulation import Results
 from tau2.data_model.tasks import Task
 from tau2.run import run_tasks
-from tau2.registry import registry
 from tau2.utils.utils import get_now
 from tau2.utils import llm_utils
-from tau2.data_model.message import AssistantMessage, ToolCall
 
+import tau2_enhanced.domain_registration  # noqa: F401 - registers the enhanced domains
 from tau2_enhanced.environments.logging_environment import LoggingEnvironment
+from tau2_enhanced.logging.serialization import dumps_json, write_jsonl
+
+
+# Number of run_tasks_enhanced calls in progress; the generate fallback only applies while > 0
+_active_runs = 0
+_active_runs_lock = threading.Lock()
+_original_generate = None
+
+_FALLBACK_CONTENT = "[Assistant did not provide a response]"
+_FALLBACK_UPDATE = {'content': _FALLBACK_CONTENT, 'tool_calls': None}
+
+
+def _generate_with_fallback(model, messages, tools=None, tool_choice=None, **kwargs):
+    """
+    Generate function that handles empty LLM responses gracefully during enhanced runs.
+    """
+    try:
+        result = _original_generate(model, messages, tools, tool_choice, **kwargs)
+        if not _active_runs:
+            return result
+
+        # Common case: the result has tool calls or non-blank content.
+        # isspace() stops at the first non-blank character without copying.
+        content = result.content
+        if result.tool_calls is not None or (
+            isinstance(content, str) and content and not content.isspace()
+        ):
+            return result
+
+        logger.warning(f"LLM {model} returned empty response, providing fallback content")
+        # Copy the message with fallback content; model_copy skips re-validation
+        return result.model_copy(update=_FALLBACK_UPDATE)
+
+    except Exception as e:
+        logger.error(f"Error in generate function: {e}")
+        raise
+
+
+def _install_generate_fallback():
+    """Install the empty-response fallback around llm_utils.generate (once per process)."""
+    global _original_generate
+    if llm_utils.generate is not _generate_with_fallback:
+        _original_generate = llm_utils.generate
+        llm_utils.generate = _generate_with_fallback
+
+
+def _enter_enhanced_run() -> int:
+    """
+    Mark an enhanced run as active, installing the generate fallback if needed.
+
+    Returns:
+        Number of other enhanced runs already in progress
+    """
+    global _active_runs
+    with _active_runs_lock:
+        _install_generate_fallback()
+        other_runs = _active_runs
+        _active_runs += 1
+    return other_runs
+
+
+def _exit_enhanced_run():
+    """Mark an enhanced run as finished."""
+    global _active_runs
+    with _active_runs_lock:
+        _active_runs -= 1
+
+
+@lru_cache(maxsize=64)
+def _clean_model_name(name: str) -> str:
+    """Strip the provider prefix from a model name (e.g. 'xai/grok-3' -> 'grok-3')."""
+    return name.rpartition("/")[2]
+
+
+@lru_cache(maxsize=None)
+def _get_default_llms() -> tuple[str, str]:
+    """Resolve tau2's default agent and user LLMs (imported on first use)."""
+    from tau2.config import DEFAULT_LLM_AGENT, DEFAULT_LLM_USER
+    return DEFAULT_LLM_AGENT, DEFAULT_LLM_USER
 
 
 def make_enhanced_run_name(
@@ -27,114 +108,58 @@ def make_enhanced_run_name(
     """
     Make a run name using the same pattern as tau2-bench make_run_name.
     """
-    clean_llm_agent_name = llm_agent.split("/")[-1]
-    agent_name = f"{agent}_{clean_llm_agent_name}"
-    clean_llm_user_name = llm_user.split("/")[-1]
-    user_name = f"{user}_{clean_llm_user_name}"
+    agent_name = f"{agent}_{_clean_model_name(llm_agent)}"
+    user_name = f"{user}_{_clean_model_name(llm_user)}"
     return f"{get_now()}_{domain}_{agent_name}_{user_name}"
 
 
 class EnhancedRunner:
     """Enhanced runner that captures detailed logging from LoggingEnvironment."""
 
-    def __init__(self, save_dir: Optional[str] = None):
+    __slots__ = ('save_dir', '_environment_instances')
+
+    def __init__(self, save_dir: str | None = None):
         """
         Initialize enhanced runner.
 
         Args:
             save_dir: Directory to save enhanced logs. If None, uses current directory + 'enhanced_logs'
         """
-        if save_dir is None:
-            save_dir = os.path.join(os.getcwd(), 'enhanced_logs')
+        # Created on first save
+        self.save_dir = Path.cwd() / 'enhanced_logs' if save_dir is None else Path(save_dir)
 
-        self.save_dir = Path(save_dir)
-        self.save_dir.mkdir(exist_ok=True)
-
-        # Store environment instances to capture logs later
-        self._environment_instances: List[LoggingEnvironment] = []
+        # Store environment instances (keyed by id, so each is captured once) to capture logs later
+        self._environment_instances: dict[int, LoggingEnvironment] = {}
 
     def run_tasks_enhanced(
         self,
         domain: str,
-        tasks: List[Task],
+        tasks: list[Task],
         agent: str,
         user: str,
-        llm_agent: Optional[str] = None,
-        llm_args_agent: Optional[Dict] = None,
-        llm_user: Optional[str] = None,
-        llm_args_user: Optional[Dict] = None,
+        llm_agent: str | None = None,
+        llm_args_agent: dict | None = None,
+        llm_user: str | None = None,
+        llm_args_user: dict | None = None,
         num_trials: int = 1,
         max_steps: int = 100,
         max_errors: int = 5,
         max_concurrency: int = 1,
-        seed: Optional[int] = None,
+        seed: int | None = None,
         log_level: str = "INFO",
         **kwargs
-    ) -> tuple[Results, Dict[str, Any]]:
+    ) -> tuple[Results, dict[str, Any]]:
         """
         Run tasks with enhanced logging capture.
 
+        The enhanced logs' 'execution_events' and 'state_snapshots' entries
+        are lazy, re-iterable views over the captured environments that
+        support len(); use list() on them for indexing.
+
         Returns:
             tuple: (original Results object, enhanced_logs dictionary)
         """
-        # Clear previous environment instances
-        self._environment_instances.clear()
-
-        # Monkey patch the environment creation to capture instances
-        original_get_env_constructor = registry.get_env_constructor
-
-        def patched_get_env_constructor(domain_name: str):
-            env_constructor = original_get_env_constructor(domain_name)
-
-            def wrapped_constructor(**kwargs):
-                env = env_constructor(**kwargs)
-                if isinstance(env, LoggingEnvironment):
-                    self._environment_instances.append(env)
-                else:
-                    logger.debug(f"Environment is not LoggingEnvironment: {type(env).__module__}.{type(env).__name__}")
-                return env
-
-            return wrapped_constructor
-
-        # Monkey patch the generate function to handle empty responses
-        original_generate = llm_utils.generate
-
-        def patched_generate(model, messages, tools=None, tool_choice=None, **kwargs):
-            """
-            Patched generate function that handles empty LLM responses gracefully.
-            """
-            try:
-                result = original_generate(model, messages, tools, tool_choice, **kwargs)
-
-                # Check if the result has neither content nor tool calls
-                has_content = (result.content is not None and
-                             isinstance(result.content, str) and
-                             result.content.strip() != "")
-                has_tool_calls = result.tool_calls is not None
-
-                if not has_content and not has_tool_calls:
-                    logger.warning(f"LLM {model} returned empty response, providing fallback content")
-                    # Create a new AssistantMessage with fallback content
-                    result = AssistantMessage(
-                        role="assistant",
-                        content="[Assistant did not provide a response]",
-                        tool_calls=None,
-                        cost=result.cost,
-                        usage=result.usage,
-                        raw_data=result.raw_data,
-                    )
-
-                return result
-
-            except Exception as e:
-                logger.error(f"Error in generate function: {e}")
-                raise
-
-        # Apply monkey patches
-        registry.get_env_constructor = patched_get_env_constructor
-        llm_utils.generate = patched_generate
-
-        try:
+        with self._capture_environments() as environment_instances:
             # Run the original tasks
             results: Results = run_tasks(
                 domain=domain,
@@ -154,44 +179,89 @@ class EnhancedRunner:
                 **kwargs
             )
 
-        finally:
-            # Restore original functions
-            registry.get_env_constructor = original_get_env_constructor
-            llm_utils.generate = original_generate
-
         # Capture enhanced logs from LoggingEnvironments
-        enhanced_logs = self._capture_enhanced_logs()
+        enhanced_logs = self._capture_enhanced_logs(environment_instances)
 
         return results, enhanced_logs
 
-    def _capture_enhanced_logs(self) -> Dict[str, Any]:
-        """Capture and aggregate enhanced logs from all LoggingEnvironment instances."""
-        logger.info(f"Starting log capture. Environment instances found: {len(self._environment_instances)}")
+    @contextmanager
+    def _capture_environments(self) -> Iterator[dict[int, LoggingEnvironment]]:
+        """
+        Collect LoggingEnvironments created while the context is active.
+
+        The mapping holds strong references: tau2 discards each environment
+        when its simulation ends, so without them the logs would be lost
+        before capture. Each run gets its own mapping of
+        ``id(env) -> env``, which also becomes the runner's
+        ``_environment_instances``; an environment reported more than once
+        is only captured once. The empty-response fallback for
+        ``llm_utils.generate`` is active for the same scope. Captured
+        environments are flushed when the context exits.
+
+        Concurrent runs in one process are not supported. tau2 creates the
+        environments on its own worker threads, so they cannot be attributed
+        to the run that caused them, and every active run captures every
+        environment created while it is active. A warning is logged when
+        runs overlap.
+        """
+        environment_instances: dict[int, LoggingEnvironment] = {}
+        self._environment_instances = environment_instances
 
-        if not self._environment_instances:
-            logger.warning("No LoggingEnvironment instances captured during execution!")
-            return {}
+        def listener(env: LoggingEnvironment) -> None:
+            environment_instances.setdefault(id(env), env)
 
-        # Aggregate logs from all environment instances
-        all_execution_events = []
-        all_state_snapshots = []
-        environments_with_logs = 0
+        LoggingEnvironment.add_instance_listener(listener)
+        if _enter_enhanced_run():
+            logger.warning(
+                "Another enhanced run is in progress in this process; "
+                "their captured enhanced logs will include each other's environments"
+            )
+        try:
+            yield environment_instances
+        finally:
+            LoggingEnvironment.remove_instance_listener(listener)
+            _exit_enhanced_run()
+            # Write out batched events now rather than relying on __del__
+            for env in environment_instances.values():
+                env.flush()
 
-        for i, env in enumerate(self._environment_instances):
-            if not hasattr(env, 'get_enhanced_logs'):
-                continue
+    def _capture_enhanced_logs(
+        self,
+        environment_instances: dict[int, LoggingEnvironment] | None = None
+    ) -> dict[str, Any]:
+        """Capture and aggregate enhanced logs from all LoggingEnvironment instances."""
+        if environment_instances is None:
+            environment_instances = self._environment_instances
 
-            enhanced_logs = env.get_enhanced_logs()
-            execution_events = enhanced_logs.get('execution_events', [])
-            state_snapshots = enhanced_logs.get('state_snapshots', [])
+        logger.info(f"Starting log capture. Environment instances found: {len(environment_instances)}")
 
-            if execution_events or state_snapshots:
-                environments_with_logs += 1
-                all_execution_events.extend(execution_events)
-                all_state_snapshots.extend(state_snapshots)
+        if not environment_instances:
+            logger.warning("No LoggingEnvironment instances captured during execution!")
+            return {}
 
-                logger.debug(f"Environment {i} contributed {len(execution_events)} execution logs and "
-                           f"{len(state_snapshots)} state snapshots")
+        # Count each environment's records without converting any of them
+        environments = []
+        total_events = total_snapshots = 0
+        for env in environment_instances.values():
+            event_count = _environment_event_count(env)
+            snapshot_count = len(env.state_tracker.snapshots)
+            if not (event_count or snapshot_count):
+                continue
+            logger.debug("Environment {} contributed {} execution logs and {} state snapshots",
+                         len(environments), event_count, snapshot_count)
+            environments.append(env)
+            total_events += event_count
+            total_snapshots += snapshot_count
+        environments_with_logs = len(environments)
+
+        # Lazy views: records are converted to dicts only while being iterated,
+        # e.g. streamed to disk by save_enhanced_results(logs_format='jsonl')
+        all_execution_events = _EnvironmentRecords(
+            environments, LoggingEnvironment.iter_events, total_events
+        )
+        all_state_snapshots = _EnvironmentRecords(
+            environments, LoggingEnvironment.iter_snapshots, total_snapshots
+        )
 
         # Create enhanced logs dictionary
         enhanced_logs_dict = {
@@ -202,7 +272,7 @@ class EnhancedRunner:
                 'total_execution_logs': len(all_execution_events),
                 'total_state_snapshots': len(all_state_snapshots),
                 'environments_with_logs': environments_with_logs,
-                'environment_instances': len(self._environment_instances)
+                'environment_instances': len(environment_instances)
             }
         }
 
@@ -214,52 +284,143 @@ class EnhancedRunner:
     def save_enhanced_results(
         self,
         results: Results,
-        enhanced_logs: Dict[str, Any],
+        enhanced_logs: dict[str, Any],
         domain: str,
         agent: str,
         user: str,
         llm_agent: str,
         llm_user: str,
-        save_to: Optional[str] = None
+        save_to: str | None = None,
+        pretty: bool = False,
+        logs_format: str = "json"
     ) -> tuple[Path, Path]:
-        """Save both original results and enhanced logs as separate files."""
+        """
+        Save both original results and enhanced logs as separate files.
+
+        The enhanced logs are written as compact JSON unless ``pretty`` is set,
+        which roughly halves their size and serialization time. With
+        ``logs_format='jsonl'`` they are streamed one record per line instead: a
+        header record with the timestamp and summary, followed by one record
+        per execution event and state snapshot. Logs captured by
+        run_tasks_enhanced are then read straight from each environment, so
+        the full list of records is never built; the JSON format has to
+        build it to write a single document.
+        """
+        if logs_format not in ('json', 'jsonl'):
+            raise ValueError(f"Unsupported enhanced logs format: {logs_format}")
+
+        self.save_dir.mkdir(parents=True, exist_ok=True)
+
         if save_to:
-            # Use custom filename - save_to should be the base name without extension
+            # Use custom filename - a trailing .json extension is optional
             base_path = self.save_dir / save_to
         else:
             # Generate filename using the same pattern as tau2-bench
             run_name = make_enhanced_run_name(domain, agent, user, llm_agent, llm_user)
             base_path = self.save_dir / run_name
 
+        main_path, logs_path = self._get_result_paths(base_path, logs_format)
+
         # Save original results
-        main_path = base_path.with_suffix('.json')
         results.save(main_path)
 
         # Save enhanced logs separately
-        logs_path = Path(str(base_path) + '_enhanced_logs.json')
-        with open(logs_path, 'w') as f:
-            import json
-            json.dump(enhanced_logs, f, indent=2)
+        if logs_format == 'jsonl':
+            write_jsonl(logs_path, _iter_enhanced_log_records(enhanced_logs))
+        else:
+            logs_path.write_bytes(dumps_json(_materialize_records(enhanced_logs), pretty=pretty))
+
+        return main_path, logs_path
 
+    @staticmethod
+    def _get_result_paths(base_path: Path, logs_format: str = "json") -> tuple[Path, Path]:
+        """Get the results and enhanced logs paths for a base path."""
+        # Append '.json' to the name rather than using with_suffix(): run names
+        # contain dots (e.g. 'gpt-4.1') that would be treated as an extension.
+        # A base path that already ends in '.json' is used as-is.
+        if base_path.suffix == '.json':
+            main_path = base_path
+        else:
+            main_path = base_path.with_name(f"{base_path.name}.json")
+        logs_path = base_path.with_name(f"{base_path.name}_enhanced_logs.{logs_format}")
         return main_path, logs_path
 
 
+class _EnvironmentRecords:
+    """
+    Read-only, re-iterable view of records across several environments.
+
+    Each iteration converts records to dictionaries one at a time through
+    the given per-environment iterator, so nothing is aggregated up front.
+    """
+
+    __slots__ = ('_environments', '_iter_records', '_count')
+
+    def __init__(
+        self,
+        environments: list[LoggingEnvironment],
+        iter_records: Callable[[LoggingEnvironment], Iterable[dict[str, Any]]],
+        count: int
+    ):
+        self._environments = tuple(environments)
+        self._iter_records = iter_records
+        self._count = count
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return chain.from_iterable(self._iter_records(env) for env in self._environments)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return f"<{self._count} records from {len(self._environments)} environments>"
+
+
+def _environment_event_count(env: LoggingEnvironment) -> int:
+    """Count the execution events env.iter_events() yields, spilled ones included."""
+    statistics = env.execution_logger.get_statistics()
+    return statistics['memory_events'] + statistics['spilled_events']
+
+
+def _materialize_records(enhanced_logs: dict[str, Any]) -> dict[str, Any]:
+    """Return enhanced logs with lazy record views replaced by lists, for JSON output."""
+    return {
+        key: list(value) if isinstance(value, _EnvironmentRecords) else value
+        for key, value in enhanced_logs.items()
+    }
+
+
+def _iter_enhanced_log_records(enhanced_logs: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Yield the JSONL records for an enhanced logs dictionary."""
+    yield {
+        'record_type': 'header',
+        'timestamp': enhanced_logs.get('timestamp'),
+        'summary': enhanced_logs.get('summary', {})
+    }
+    for event in enhanced_logs.get('execution_events', ()):
+        yield {'record_type': 'execution_event', 'data': event}
+    for snapshot in enhanced_logs.get('state_snapshots', ()):
+        yield {'record_type': 'state_snapshot', 'data': snapshot}
+
+
 # Convenience function for direct usage
 def run_enhanced_simulation(
     domain: str,
-    tasks: List[Task],
+    tasks: list[Task],
     agent: str = "llm_agent",
     user: str = "user_simulator",
-    llm_agent: Optional[str] = None,
-    llm_user: Optional[str] = None,
-    save_to: Optional[str] = None,
+    llm_agent: str | None = None,
+    llm_user: str | None = None,
+    save_to: str | None = None,
+    pretty: bool = False,
     **kwargs
-) -> tuple[Results, Dict[str, Any], tuple[Path, Path]]:
+) -> tuple[Results, dict[str, Any], tuple[Path, Path]]:
     """
     Convenience function to run enhanced simulation and save results.
 
     Args:
         save_to: Custom filename for the results (without extension)
+        pretty: Whether to indent the saved enhanced logs
 
     Returns:
         Tuple of (results, enhanced_logs, (main_path, logs_path))
@@ -268,12 +429,12 @@ def run_enhanced_simulation(
         Results are always saved to 'enhanced_logs' directory in the current working directory.
     """
     # Set defaults for LLM models if not provided
-    if llm_agent is None:
-        from tau2.config import DEFAULT_LLM_AGENT
-        llm_agent = DEFAULT_LLM_AGENT
-    if llm_user is None:
-        from tau2.config import DEFAULT_LLM_USER
-        llm_user = DEFAULT_LLM_USER
+    if llm_agent is None or llm_user is None:
+        default_llm_agent, default_llm_user = _get_default_llms()
+        if llm_agent is None:
+            llm_agent = default_llm_agent
+        if llm_user is None:
+            llm_user = default_llm_user
 
     # EnhancedRunner defaults to 'enhanced_logs' directory when save_dir is None
     runner = EnhancedRunner(save_dir=None)
@@ -295,6 +456,7 @@ def run_enhanced_simulation(
         user=user,
         llm_agent=llm_agent,
         llm_user=llm_user,
-        save_to=save_to
+        save_to=save_to,
+        pretty=pretty
     )
     return results, enhanced_logs, paths
\ No newline at end of file
@@ -1,10 +1,11 @@
+import threading
 import time
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
 from pathlib import Path
 
 from tau2.environment.environment import Environment
-from tau2.utils.utils import get_now
 from tau2_enhanced.logging import ExecutionLogger, StateTracker
+from tau2_enhanced.logging.serialization import dumps_json
 
 
 class LoggingEnvironment(Environment):
@@ -15,14 +16,47 @@ class LoggingEnvironment(Environment):
     logging capabilities using ExecutionLogger and StateTracker.
     """
 
-    def __init__(self, *args, log_file: Optional[str] = None, **kwargs):
+    # Callbacks notified of every new instance. Replaced (never mutated) so
+    # constructing threads can iterate it without locking; updates are
+    # serialized by _instance_listeners_lock so concurrent runners don't
+    # lose each other's listeners.
+    _instance_listeners: tuple[Callable[["LoggingEnvironment"], None], ...] = ()
+    _instance_listeners_lock = threading.Lock()
+
+    def __init__(
+        self,
+        *args,
+        log_file: Optional[str] = None,
+        read_only_tools: Optional[Iterable[str]] = None,
+        max_memory_events: Optional[int] = None,
+        **kwargs
+    ):
+        """
+        Initialize the logging environment.
+
+        Args:
+            *args: Positional arguments forwarded to Environment
+            log_file: Optional path to a JSONL file for execution events
+            read_only_tools: Names of agent tools known never to modify the
+                database. Calls to them reuse the last known DB hash instead of
+                hashing the database before and after the call. Nothing is
+                assumed read-only unless listed here.
+            max_memory_events: Optional cap on execution events held in
+                memory; the oldest half is spilled to a temporary JSONL file
+                once it is reached. Spilled events are still included by
+                iter_events(), get_enhanced_logs() and export_logs().
+            **kwargs: Keyword arguments forwarded to Environment
+        """
         super().__init__(*args, **kwargs)
 
+        self.read_only_tools = frozenset(read_only_tools or ())
+
         # Initialize structured loggers
         self.execution_logger = ExecutionLogger(
             log_file=log_file,
-            auto_flush=True,
-            console_output=False  # Avoid double logging with tau2's logger
+            auto_flush=False,  # Batch file writes; call flush()/close() when done
+            console_output=False,  # Avoid double logging with tau2's logger
+            max_memory_events=max_memory_events
         )
         self.state_tracker = StateTracker(
             max_snapshots=1000,
@@ -33,6 +67,25 @@ class LoggingEnvironment(Environment):
         # Tracking variables
         self.pre_call_state: dict[str, Any] | None = None
         self._step_counter = 0
+        self._last_db_hash: str | None = None
+
+        for listener in LoggingEnvironment._instance_listeners:
+            listener(self)
+
+    @staticmethod
+    def add_instance_listener(listener: Callable[["LoggingEnvironment"], None]) -> None:
+        """Register a callback invoked with each LoggingEnvironment on creation."""
+        with LoggingEnvironment._instance_listeners_lock:
+            LoggingEnvironment._instance_listeners = LoggingEnvironment._instance_listeners + (listener,)
+
+    @staticmethod
+    def remove_instance_listener(listener: Callable[["LoggingEnvironment"], None]) -> None:
+        """Unregister a callback previously added with add_instance_listener."""
+        with LoggingEnvironment._instance_listeners_lock:
+            LoggingEnvironment._instance_listeners = tuple(
+                registered for registered in LoggingEnvironment._instance_listeners
+                if registered != listener
+            )
 
     def make_tool_call(self, tool_name: str, requestor="assistant", **kwargs) -> Any:
         """
@@ -43,38 +96,34 @@ class LoggingEnvironment(Environment):
         """
         # Increment step counter
         self._step_counter += 1
-
-        # Capture pre-call state
-        pre_state_data = self._capture_current_state()
-        pre_state_hash = self.get_db_hash()
-
-        # Create pre-execution state snapshot
-        self.state_tracker.create_snapshot(
-            state_data=pre_state_data,
-            action_trigger=f"before_{tool_name}",
-            agent_turn=(requestor == "assistant"),
-            metadata={
-                'tool_name': tool_name,
-                'requestor': requestor,
-                'step': self._step_counter,
-                'args_count': len(kwargs)
-            }
-        )
+        step = self._step_counter
+        agent_turn = requestor == "assistant"
+        tool_call_id = f"{tool_name}_{step}"
+
+        # Capture pre-call state; read-only agent tools reuse the last known hash
+        read_only = agent_turn and tool_name in self.read_only_tools
+        if read_only and self._last_db_hash is not None:
+            pre_state_hash = self._last_db_hash
+        else:
+            pre_state_hash = self.get_db_hash()
+        # Only calls that can change state need a baseline for the delta snapshot
+        pre_state_data = None if read_only else self._capture_current_state(db_hash=pre_state_hash)
 
         start_time = time.time()
-        tool_call_id = f"{tool_name}_{self._step_counter}"
 
         try:
             # Call the original method
             result = super().make_tool_call(tool_name, requestor, **kwargs)
 
             # Capture success metrics
-            execution_time = time.time() - start_time
-            post_state_hash = self.get_db_hash()
+            end_time = time.time()
+            execution_time = end_time - start_time
+            post_state_hash = pre_state_hash if read_only else self.get_db_hash()
             state_changed = pre_state_hash != post_state_hash
+            self._last_db_hash = post_state_hash
 
             # Log successful tool execution
-            self.execution_logger.log_tool_execution(
+            tool_event = self.execution_logger.log_tool_execution(
                 tool_name=tool_name,
                 success=True,
                 execution_time=execution_time,
@@ -87,17 +136,20 @@ class LoggingEnvironment(Environment):
 
             # Handle state changes
             if state_changed:
-                # Create post-execution state snapshot
-                post_state_data = self._capture_current_state()
-                self.state_tracker.create_snapshot(
-                    state_data=post_state_data,
+                # Record a single snapshot holding only what the call changed
+                post_state_data = self._capture_current_state(db_hash=post_state_hash, timestamp=end_time)
+                self.state_tracker.create_delta_snapshot(
+                    pre_state_data=pre_state_data,
+                    post_state_data=post_state_data,
                     action_trigger=f"after_{tool_name}",
-                    agent_turn=(requestor == "assistant"),
+                    agent_turn=agent_turn,
+                    timestamp=end_time,
                     metadata={
                         'tool_name': tool_name,
                         'requestor': requestor,
-                        'step': self._step_counter,
-                        'result_size': len(str(result)) if result else 0
+                        'step': step,
+                        'args_count': len(kwargs),
+                        'result_size': tool_event.result_size or 0
                     }
                 )
 
@@ -116,6 +168,9 @@ class LoggingEnvironment(Environment):
         except Exception as e:
             # Capture error details
             execution_time = time.time() - start_time
+            # A failed write may still have touched the database
+            if not read_only:
+                self._last_db_hash = None
 
             # Log failed tool execution
             self.execution_logger.log_tool_execution(
@@ -133,32 +188,66 @@ class LoggingEnvironment(Environment):
             # Re-raise the original exception
             raise
 
-    def _capture_current_state(self) -> Dict[str, Any]:
+    def set_state(self, *args, **kwargs):
+        """Set the environment state, forgetting the cached DB hash."""
+        try:
+            return super().set_state(*args, **kwargs)
+        finally:
+            self._last_db_hash = None
+
+    def sync_tools(self, *args, **kwargs):
+        """Sync agent and user tools, forgetting the cached DB hash."""
+        try:
+            return super().sync_tools(*args, **kwargs)
+        finally:
+            self._last_db_hash = None
+
+    def run_env_function_call(self, *args, **kwargs):
+        """Run an environment function call, forgetting the cached DB hash."""
+        try:
+            return super().run_env_function_call(*args, **kwargs)
+        finally:
+            self._last_db_hash = None
+
+    def _capture_current_state(
+        self,
+        db_hash: Optional[str] = None,
+        timestamp: Optional[float] = None
+    ) -> Dict[str, Any]:
         """
         Capture current environment state for tracking.
 
+        Args:
+            db_hash: Database hash already computed for this state, if any
+            timestamp: Capture time already read by the caller, if any
+
         Returns:
             Dictionary containing current state information
         """
         state_data = {
             'domain_name': self.domain_name,
             'step_counter': self._step_counter,
-            'timestamp': time.time()
+            'timestamp': time.time() if timestamp is None else timestamp
         }
 
-        # Try to capture database state if available
+        # Try to get database state from tools
         try:
-            if hasattr(self, 'tools') and self.tools:
-                # Try to get database state from tools
-                if hasattr(self.tools, 'db'):
-                    db = self.tools.db
-                    state_data['db_info'] = {
-                        'type': type(db).__name__,
-                        'hash': self.get_db_hash()
-                    }
-                    # Add domain-specific state if available
-                    if hasattr(db, 'get_state_summary'):
-                        state_data['db_summary'] = db.get_state_summary()
+            db = self.tools.db
+        except AttributeError:
+            return state_data  # No tools, or tools without a database
+
+        try:
+            state_data['db_info'] = {
+                'type': type(db).__name__,
+                'hash': self.get_db_hash() if db_hash is None else db_hash
+            }
+            # Add domain-specific state if available
+            try:
+                get_state_summary = db.get_state_summary
+            except AttributeError:
+                pass
+            else:
+                state_data['db_summary'] = get_state_summary()
 
         except Exception as e:
             state_data['capture_error'] = str(e)
@@ -173,26 +262,41 @@ class LoggingEnvironment(Environment):
             Dictionary containing structured events, snapshots, and performance statistics
         """
         return {
-            'execution_events': [event.to_dict() for event in self.execution_logger.events],
-            'state_snapshots': [snapshot.to_dict() for snapshot in self.state_tracker.snapshots],
+            'execution_events': list(self.iter_events()),
+            'state_snapshots': list(self.iter_snapshots()),
             'statistics': {
                 'execution_logger': self.execution_logger.get_statistics(),
                 'state_tracker': self.state_tracker.get_statistics()
             },
-            'summary': {
-                'total_tool_executions': len(self.execution_logger.get_tool_execution_events()),
-                'total_state_changes': len(self.execution_logger.get_state_change_events()),
-                'total_context_reductions': len(self.execution_logger.get_context_reduction_events()),
-                'total_snapshots': len(self.state_tracker.snapshots),
-                'steps_completed': self._step_counter
-            }
+            'summary': self._get_summary()
+        }
+
+    def iter_events(self) -> Iterator[Dict[str, Any]]:
+        """Yield execution events as dictionaries, one at a time."""
+        yield from self.execution_logger.iter_event_dicts()
+
+    def iter_snapshots(self) -> Iterator[Dict[str, Any]]:
+        """Yield state snapshots as dictionaries, one at a time."""
+        yield from self.state_tracker.iter_snapshot_dicts()
+
+    def _get_summary(self) -> Dict[str, Any]:
+        """Get the summary counts without serializing any events."""
+        # Running counts also cover events spilled out of memory
+        event_counts = self.execution_logger.get_statistics()['event_counts']
+        return {
+            'total_tool_executions': event_counts['tool_executions'],
+            'total_state_changes': event_counts['state_changes'],
+            'total_context_reductions': event_counts['context_reductions'],
+            'total_snapshots': len(self.state_tracker.snapshots),
+            'steps_completed': self._step_counter
         }
 
     def export_logs(
         self,
         output_dir: str,
         format: str = "json",
-        include_snapshots: bool = True
+        include_snapshots: bool = True,
+        pretty: bool = False
     ):
         """
         Export all structured logs to files.
@@ -201,8 +305,10 @@ class LoggingEnvironment(Environment):
             output_dir: Directory to save log files
             format: Export format ('json' or 'jsonl')
             include_snapshots: Whether to export state snapshots
+            pretty: Whether to indent the summary JSON
         """
-        from pathlib import Path
+        # Write out batched events so the log file matches the export
+        self.flush()
 
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
@@ -218,9 +324,15 @@ class LoggingEnvironment(Environment):
 
         # Export summary
         summary_file = output_path / "summary.json"
-        with open(summary_file, 'w') as f:
-            import json
-            json.dump(self.get_structured_logs()['summary'], f, indent=2)
+        summary_file.write_bytes(dumps_json(self._get_summary(), pretty=pretty))
+
+    def flush(self):
+        """Flush batched execution events to the log file."""
+        self.execution_logger.flush()
+
+    def close(self):
+        """Flush batched execution events and close the log file."""
+        self.execution_logger.close()
 
     def _compute_state_diff(self, pre_state: str | None, post_state: str | None) -> str:
         """
@@ -241,7 +353,7 @@ class LoggingEnvironment(Environment):
     def __del__(self):
         """Cleanup when environment is destroyed."""
         try:
-            # Ensure logs are flushed
+            # Best effort only; callers should flush() or close() explicitly
             if hasattr(self, 'execution_logger'):
                 self.execution_logger.flush()
         except Exception:
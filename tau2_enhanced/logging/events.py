@@ -6,22 +6,46 @@ logging system. Each event type captures specific information about different
 aspects of tau2-bench execution.
 """
 
+import re
+import threading
 import time
 from enum import Enum
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, field
+from typing import Any, ClassVar, Dict, List, Optional
+from dataclasses import dataclass, field, fields
 
+from .serialization import dumps_json
 
-class LogLevel(Enum):
-    """Log levels for execution events."""
+# Heuristics for flagging tool arguments, compiled once for single-pass matching
+_FILE_INDICATORS_RE = re.compile(r'file|path|filename|document|upload|attachment', re.IGNORECASE)
+_SENSITIVE_INDICATORS_RE = re.compile(
+    r'password|key|secret|token|auth|credential|ssn|credit', re.IGNORECASE
+)
+
+# Serializes deferred ToolExecutionEvent analysis across threads
+_ANALYSIS_LOCK = threading.Lock()
+
+
+class LogLevel(str, Enum):
+    """
+    Log levels for execution events.
+
+    Members are strings, so they serialize and compare as their value
+    (e.g. ``LogLevel.INFO == "info"``) without going through ``.value``.
+    """
     DEBUG = "debug"
     INFO = "info"
     WARNING = "warning"
     ERROR = "error"
     CRITICAL = "critical"
 
+    __str__ = str.__str__
 
-@dataclass
+
+# Direct value -> member lookup for deserialization, bypassing the Enum constructor
+_LOG_LEVELS = {level.value: level for level in LogLevel}
+
+
+@dataclass(slots=True)
 class ExecutionEvent:
     """Base class for all execution events."""
 
@@ -31,37 +55,41 @@ class ExecutionEvent:
     message: str = ""
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+    # Dictionary form memoized by ExecutionLogger once the event has been logged
+    _cached_dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
+    # Serialized 'event_type', set once per class rather than looked up per event
+    _EVENT_TYPE: ClassVar[str] = "ExecutionEvent"
+
+    def __init_subclass__(cls, **kwargs):
+        # Explicit super(): slots=True rebuilds the class, breaking the zero-argument form
+        super(ExecutionEvent, cls).__init_subclass__(**kwargs)
+        cls._EVENT_TYPE = cls.__name__
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert event to dictionary for serialization."""
         return {
             'timestamp': self.timestamp,
-            'level': self.level.value,
+            'level': self.level,
             'source': self.source,
             'message': self.message,
             'metadata': self.metadata,
-            'event_type': self.__class__.__name__
+            'event_type': self._EVENT_TYPE
         }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'ExecutionEvent':
         """Create event from dictionary."""
-        # Handle enum conversion
-        if 'level' in data and isinstance(data['level'], str):
-            data['level'] = LogLevel(data['level'])
-
-        # Remove event_type as it's not a field
-        data.pop('event_type', None)
-
-        return cls(**data)
+        return cls(**_constructor_kwargs(cls, data))
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolExecutionEvent(ExecutionEvent):
     """Event for comprehensive tool call execution tracking."""
 
     # Core tool execution data
     tool_name: str = ""
-    tool_args: Dict[str, Any] = field(default_factory=dict)
+    tool_args: Optional[Dict[str, Any]] = None
     execution_time: Optional[float] = None
     success: bool = True
     error_message: Optional[str] = None
@@ -71,7 +99,7 @@ class ToolExecutionEvent(ExecutionEvent):
     result_preview: str = ""
     requestor: str = "assistant"
     tool_call_id: str = ""
-    validation_errors: List[str] = field(default_factory=list)
+    validation_errors: Optional[List[str]] = None
     state_changed: bool = False
 
     # Enhanced argument tracking
@@ -83,11 +111,12 @@ class ToolExecutionEvent(ExecutionEvent):
     has_large_args: bool = False
     sensitive_args_detected: bool = False
 
-    # Function signature and usage tracking
-    required_args_provided: List[str] = field(default_factory=list)
-    optional_args_provided: List[str] = field(default_factory=list)
-    missing_args: List[str] = field(default_factory=list)
-    unexpected_args: List[str] = field(default_factory=list)
+    # Function signature and usage tracking (these and validation_errors are
+    # rarely populated, so they default to None and serialize as empty lists)
+    required_args_provided: Optional[List[str]] = None
+    optional_args_provided: Optional[List[str]] = None
+    missing_args: Optional[List[str]] = None
+    unexpected_args: Optional[List[str]] = None
 
     # Result analysis
     result_type: Optional[str] = None
@@ -95,13 +124,24 @@ class ToolExecutionEvent(ExecutionEvent):
     result_contains_errors: bool = False
     result_truncated: bool = False
 
+    # Whether the argument/result analysis above has been run
+    _analyzed: bool = field(default=False, init=False, repr=False, compare=False)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert event to dictionary for serialization."""
-        base = super().to_dict()
-        base.update({
+        self._ensure_analyzed()
+        # One dict literal with the base fields inlined, rather than base + update()
+        return {
+            'timestamp': self.timestamp,
+            'level': self.level,
+            'source': self.source,
+            'message': self.message,
+            'metadata': self.metadata,
+            'event_type': self._EVENT_TYPE,
+
             # Core execution data
             'tool_name': self.tool_name,
-            'tool_args': self.tool_args,
+            'tool_args': self.tool_args or {},
             'execution_time': self.execution_time,
             'success': self.success,
             'error_message': self.error_message,
@@ -110,7 +150,7 @@ class ToolExecutionEvent(ExecutionEvent):
             'result_preview': self.result_preview,
             'requestor': self.requestor,
             'tool_call_id': self.tool_call_id,
-            'validation_errors': self.validation_errors,
+            'validation_errors': self.validation_errors or [],
             'state_changed': self.state_changed,
 
             # Enhanced argument tracking
@@ -123,10 +163,10 @@ class ToolExecutionEvent(ExecutionEvent):
             'sensitive_args_detected': self.sensitive_args_detected,
 
             # Function signature tracking
-            'required_args_provided': self.required_args_provided,
-            'optional_args_provided': self.optional_args_provided,
-            'missing_args': self.missing_args,
-            'unexpected_args': self.unexpected_args,
+            'required_args_provided': self.required_args_provided or [],
+            'optional_args_provided': self.optional_args_provided or [],
+            'missing_args': self.missing_args or [],
+            'unexpected_args': self.unexpected_args or [],
 
             # Result analysis
             'result_type': self.result_type,
@@ -136,8 +176,7 @@ class ToolExecutionEvent(ExecutionEvent):
 
             # Don't include full result to avoid huge logs
             'has_result': self.result is not None
-        })
-        return base
+        }
 
     def __post_init__(self):
         """Post-initialization processing with enhanced argument analysis."""
@@ -156,110 +195,133 @@ class ToolExecutionEvent(ExecutionEvent):
         else:
             self.level = LogLevel.INFO
 
-        # Analyze arguments if not already set
-        if self.tool_args and not self.args_count:
-            self._analyze_arguments()
+        # Argument and result analysis is deferred until the event is serialized
+
+    def _ensure_analyzed(self):
+        """
+        Run the argument and result analysis once, on first use.
+
+        The first use may happen on the log writer thread while the caller
+        serializes the same event, so the analysis runs under a lock and the
+        flag is only set once every field has been populated.
+        """
+        if self._analyzed:
+            return
 
-        # Analyze result if not already set
-        if self.result is not None and not self.result_type:
-            self._analyze_result()
+        with _ANALYSIS_LOCK:
+            if self._analyzed:
+                return
+
+            # Analyze arguments if not already set
+            if self.tool_args and not self.args_count:
+                self._analyze_arguments()
+
+            # Analyze result if not already set
+            if self.result is not None and not self.result_type:
+                self._analyze_result()
+
+            self._analyzed = True
 
     def _analyze_arguments(self):
         """Analyze tool arguments for enhanced tracking."""
         if not self.tool_args:
             return
 
-        import json
-        import sys
-        import re
-
         # Basic argument metrics
         self.args_count = len(self.tool_args)
 
         # Calculate argument size
         try:
-            args_str = json.dumps(self.tool_args, default=str)
-            self.args_size_bytes = len(args_str.encode('utf-8'))
+            self.args_size_bytes = len(dumps_json(self.tool_args))
             self.has_large_args = self.args_size_bytes > 1024  # > 1KB
         except Exception:
             self.args_size_bytes = len(str(self.tool_args))
             self.has_large_args = self.args_size_bytes > 1024
 
-        # Analyze argument types
-        self.args_types = {
-            key: type(value).__name__ for key, value in self.tool_args.items()
-        }
+        # Walk the arguments once, collecting types, complexity counts and indicator hits
+        args_types = {}
+        complex_count = 0
+        long_string_count = 0
+        has_file_args = False
+        sensitive_args_detected = False
+        file_search = _FILE_INDICATORS_RE.search
+        sensitive_search = _SENSITIVE_INDICATORS_RE.search
+
+        for key, value in self.tool_args.items():
+            # Exact type checks: tool arguments are plain JSON-like builtins
+            value_type = type(value)
+            args_types[key] = value_type.__name__
+
+            if value_type is dict or value_type is list:
+                complex_count += 1
+            elif value_type is str and len(value) > 100:
+                long_string_count += 1
+
+            # Detect file-related and potentially sensitive arguments (basic heuristics);
+            # the patterns ignore case, so each key/value is stringified once and never lowered
+            key_str = key if type(key) is str else str(key)
+            if not has_file_args:
+                has_file_args = bool(
+                    file_search(key_str)
+                    or file_search(value if value_type is str else str(value))
+                )
+            if not sensitive_args_detected:
+                sensitive_args_detected = bool(sensitive_search(key_str))
+
+        self.args_types = args_types
+        self.has_file_args = has_file_args
+        self.sensitive_args_detected = sensitive_args_detected
 
         # Calculate complexity score (0-1, higher = more complex)
-        complexity_factors = [
-            len(self.tool_args) * 0.1,  # Number of args
-            sum(1 for v in self.tool_args.values() if isinstance(v, (dict, list))) * 0.2,  # Complex types
-            sum(1 for v in self.tool_args.values() if isinstance(v, str) and len(v) > 100) * 0.15,  # Long strings
-            (self.args_size_bytes / 1024) * 0.1 if self.args_size_bytes else 0  # Size factor
-        ]
-        self.args_complexity_score = min(sum(complexity_factors), 1.0)
-
-        # Detect file-related arguments
-        file_indicators = ['file', 'path', 'filename', 'document', 'upload', 'attachment']
-        self.has_file_args = any(
-            any(indicator in str(key).lower() for indicator in file_indicators)
-            or any(indicator in str(value).lower() for indicator in file_indicators)
-            for key, value in self.tool_args.items()
-        )
-
-        # Detect potentially sensitive arguments (basic heuristic)
-        sensitive_indicators = ['password', 'key', 'secret', 'token', 'auth', 'credential', 'ssn', 'credit']
-        self.sensitive_args_detected = any(
-            any(indicator in str(key).lower() for indicator in sensitive_indicators)
-            for key in self.tool_args.keys()
+        score = (
+            self.args_count * 0.1  # Number of args
+            + complex_count * 0.2  # Complex types
+            + long_string_count * 0.15  # Long strings
         )
+        if self.args_size_bytes:
+            score += (self.args_size_bytes / 1024) * 0.1  # Size factor
+        self.args_complexity_score = score if score < 1.0 else 1.0
 
     def _analyze_result(self):
         """Analyze result data for enhanced tracking."""
         if self.result is None:
             return
 
-        import json
-
         # Result type
-        self.result_type = type(self.result).__name__
-
-        # Calculate result size if not set
-        if not self.result_size:
-            try:
-                if isinstance(self.result, str):
-                    self.result_size = len(self.result)
-                else:
-                    result_str = json.dumps(self.result, default=str)
-                    self.result_size = len(result_str)
-            except Exception:
-                self.result_size = len(str(self.result))
+        result_cls = type(self.result)
+        self.result_type = result_cls.__name__
+
+        # Fill in the result size only for strings and bytes, where it is O(1).
+        # Other results are never stringified here just to measure them; their
+        # size is whatever the producer (ExecutionLogger) provided, if anything
+        if not self.result_size and result_cls in (str, bytes, bytearray):
+            self.result_size = len(self.result)
 
         # Calculate complexity score
-        complexity_factors = []
-        if isinstance(self.result, (dict, list)):
-            complexity_factors.append(0.3)  # Complex type
-            if isinstance(self.result, list):
-                complexity_factors.append(len(self.result) * 0.05)  # List length
-            elif isinstance(self.result, dict):
-                complexity_factors.append(len(self.result) * 0.03)  # Dict keys
+        score = 0.0
+        if result_cls is list:
+            score = 0.3 + len(self.result) * 0.05  # Complex type + list length
+        elif result_cls is dict:
+            score = 0.3 + len(self.result) * 0.03  # Complex type + dict keys
 
-        complexity_factors.append((self.result_size / 1024) * 0.1 if self.result_size else 0)
-        self.result_complexity_score = min(sum(complexity_factors), 1.0)
+        if self.result_size:
+            score += (self.result_size / 1024) * 0.1
+        self.result_complexity_score = score if score < 1.0 else 1.0
 
         # Check for errors in result
-        if isinstance(self.result, str):
+        if result_cls is str:
             error_indicators = ['error', 'failed', 'exception', 'invalid', 'not found']
+            result_lower = self.result.lower()
             self.result_contains_errors = any(
-                indicator in self.result.lower() for indicator in error_indicators
+                indicator in result_lower for indicator in error_indicators
             )
 
         # Check if result was truncated
-        if isinstance(self.result_preview, str) and isinstance(self.result, str):
+        if result_cls is str and isinstance(self.result_preview, str):
             self.result_truncated = len(self.result_preview) < len(self.result)
 
 
-@dataclass
+@dataclass(slots=True)
 class StateChangeEvent(ExecutionEvent):
     """Event for environment state changes."""
 
@@ -274,8 +336,13 @@ class StateChangeEvent(ExecutionEvent):
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert event to dictionary for serialization."""
-        base = super().to_dict()
-        base.update({
+        return {
+            'timestamp': self.timestamp,
+            'level': self.level,
+            'source': self.source,
+            'message': self.message,
+            'metadata': self.metadata,
+            'event_type': self._EVENT_TYPE,
             'state_type': self.state_type,
             'change_summary': self.change_summary,
             'action_trigger': self.action_trigger,
@@ -285,8 +352,7 @@ class StateChangeEvent(ExecutionEvent):
             # Include state snapshots if they're serializable
             'has_previous_state': self.previous_state is not None,
             'has_new_state': self.new_state is not None,
-        })
-        return base
+        }
 
     def __post_init__(self):
         """Post-initialization processing."""
@@ -297,7 +363,7 @@ class StateChangeEvent(ExecutionEvent):
             self.source = "environment:state_change"
 
 
-@dataclass
+@dataclass(slots=True)
 class ContextReductionEvent(ExecutionEvent):
     """Event for context reduction operations."""
 
@@ -306,24 +372,28 @@ class ContextReductionEvent(ExecutionEvent):
     strategy_used: str = ""
     reduction_ratio: float = 1.0
     tokens_saved: int = 0
-    warnings: List[str] = field(default_factory=list)
+    warnings: Optional[List[str]] = None
     context_type: str = "conversation"
     trigger_reason: str = ""
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert event to dictionary for serialization."""
-        base = super().to_dict()
-        base.update({
+        return {
+            'timestamp': self.timestamp,
+            'level': self.level,
+            'source': self.source,
+            'message': self.message,
+            'metadata': self.metadata,
+            'event_type': self._EVENT_TYPE,
             'original_tokens': self.original_tokens,
             'reduced_tokens': self.reduced_tokens,
             'strategy_used': self.strategy_used,
             'reduction_ratio': self.reduction_ratio,
             'tokens_saved': self.tokens_saved,
-            'warnings': self.warnings,
+            'warnings': self.warnings or [],
             'context_type': self.context_type,
             'trigger_reason': self.trigger_reason
-        })
-        return base
+        }
 
     def __post_init__(self):
         """Post-initialization processing."""
@@ -355,22 +425,48 @@ EVENT_TYPE_MAP = {
 }
 
 
-def event_from_dict(data: Dict[str, Any]) -> ExecutionEvent:
-    """Create appropriate event instance from dictionary data."""
-    event_type = data.get('event_type', 'ExecutionEvent')
-    event_class = EVENT_TYPE_MAP.get(event_type, ExecutionEvent)
+# Constructor parameters per event class, so keys derived by to_dict()
+# (e.g. 'event_type', 'has_result', 'has_previous_state') can be dropped
+# up front instead of surfacing as a TypeError
+_INIT_FIELDS = {
+    event_class: frozenset(f.name for f in fields(event_class) if f.init)
+    for event_class in EVENT_TYPE_MAP.values()
+}
 
-    # Create a copy to avoid modifying original data
-    event_data = data.copy()
+
+def _constructor_kwargs(event_class: type, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build constructor keyword arguments for an event class from serialized data.
+
+    Args:
+        event_class: Event class to construct
+        data: Dictionary produced by to_dict(); it is not modified
+
+    Returns:
+        Keyword arguments limited to the class's constructor fields
+    """
+    init_fields = _INIT_FIELDS.get(event_class)
+    if init_fields is None:
+        init_fields = _INIT_FIELDS[event_class] = frozenset(
+            f.name for f in fields(event_class) if f.init
+        )
+
+    # One pass over the data, leaving the original untouched
+    event_data = {key: value for key, value in data.items() if key in init_fields}
 
     # Handle enum conversion
-    if 'level' in event_data and isinstance(event_data['level'], str):
-        event_data['level'] = LogLevel(event_data['level'])
+    level = event_data.get('level')
+    if isinstance(level, str):
+        event_data['level'] = _LOG_LEVELS.get(level) or LogLevel(level)
+
+    return event_data
 
-    # Remove fields that don't belong to the dataclass (added by to_dict() but not in constructor)
-    extra_fields_to_remove = ['event_type', 'has_result']
-    for field in extra_fields_to_remove:
-        event_data.pop(field, None)
+
+def event_from_dict(data: Dict[str, Any]) -> ExecutionEvent:
+    """Create appropriate event instance from dictionary data."""
+    event_type = data.get('event_type', 'ExecutionEvent')
+    event_class = EVENT_TYPE_MAP.get(event_type, ExecutionEvent)
+    event_data = _constructor_kwargs(event_class, data)
 
     try:
         return event_class(**event_data)
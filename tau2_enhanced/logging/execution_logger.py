@@ -5,11 +5,21 @@ This module provides the ExecutionLogger class that handles structured event
 logging with support for multiple event types and persistent storage.
 """
 
-import json
+import atexit
+import csv
+import itertools
+import os
+import queue
+import reprlib
+import tempfile
+import threading
 import time
+import weakref
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Any, Optional, TextIO, Union
-from dataclasses import asdict
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Literal, Optional, Union
 
 from loguru import logger
 from .events import (
@@ -18,8 +28,174 @@ from .events import (
     StateChangeEvent,
     ContextReductionEvent,
     LogLevel,
+    EVENT_TYPE_MAP,
     event_from_dict
 )
+from .serialization import dumps_json, loads_json, write_jsonl
+
+
+# Statistics counter for each event class; dispatched on the exact type
+_COUNTER_KEYS = {
+    ToolExecutionEvent: 'tool_executions',
+    StateChangeEvent: 'state_changes',
+    ContextReductionEvent: 'context_reductions',
+}
+_ERROR_LEVELS = frozenset({LogLevel.ERROR, LogLevel.CRITICAL})
+
+# loguru level name for each event level, used for console output
+_CONSOLE_LEVELS = {
+    LogLevel.DEBUG: "DEBUG",
+    LogLevel.INFO: "INFO",
+    LogLevel.WARNING: "WARNING",
+    LogLevel.ERROR: "ERROR",
+    LogLevel.CRITICAL: "CRITICAL"
+}
+
+
+def _flush_at_exit(logger_ref: "weakref.ref[ExecutionLogger]"):
+    """Flush a still-alive logger's pending writes at interpreter exit."""
+    execution_logger = logger_ref()
+    if execution_logger is not None:
+        execution_logger.flush()
+
+
+# Characters of a tool result kept as its preview
+_PREVIEW_LENGTH = 200
+
+# Bounded repr for previews when result sizes are not captured: builtin
+# containers are summarized rather than walked in full
+_preview_repr = reprlib.Repr()
+_preview_repr.maxlist = _preview_repr.maxtuple = _preview_repr.maxset = 6
+_preview_repr.maxdict = 6
+_preview_repr.maxstring = _preview_repr.maxother = _PREVIEW_LENGTH
+
+
+def _summarize_result(result: Any, capture_size: bool = True) -> tuple[str, Optional[int]]:
+    """
+    Build a tool result's preview and size.
+
+    The size is the length of the result's string form, the same measure the
+    analyzer uses for results loaded from tau2 logs; binary results report
+    their length in bytes instead. With ``capture_size`` off, other results
+    are previewed through a bounded repr and their size is left unset, so
+    large containers are never stringified in full.
+
+    Args:
+        result: Result returned by the tool
+        capture_size: Whether to measure the result's full string form
+
+    Returns:
+        Tuple of (preview, size)
+    """
+    if result is None:
+        return "", None
+    if isinstance(result, str):
+        return result[:_PREVIEW_LENGTH], len(result)
+    if isinstance(result, (bytes, bytearray)):
+        # Slice before converting so large payloads are never repr()'d in full
+        return repr(result[:_PREVIEW_LENGTH])[:_PREVIEW_LENGTH], len(result)
+    if not capture_size:
+        return _preview_repr.repr(result)[:_PREVIEW_LENGTH], None
+    result_str = str(result)
+    return result_str[:_PREVIEW_LENGTH], len(result_str)
+
+
+def _event_dict(event: ExecutionEvent) -> Dict[str, Any]:
+    """
+    Return a logged event's dictionary form, building it at most once.
+
+    The writer thread, spills, iter_event_dicts() and exports all need the
+    same dictionary, so it is memoized on the event. The returned dict is
+    shared and must be treated as read-only.
+    """
+    event_dict = event._cached_dict
+    if event_dict is None:
+        event_dict = event._cached_dict = event.to_dict()
+    return event_dict
+
+
+class _LogSink:
+    """
+    Background writer that persists events to a JSONL file.
+
+    Producers only enqueue events; serialization and file writes happen on a
+    daemon thread, so logging never blocks the simulation thread on I/O.
+    Pending lines are written once ``buffer_size`` events or ``buffer_bytes``
+    bytes have accumulated, or whenever the queue runs dry.
+    """
+
+    _STOP = object()
+
+    def __init__(self, fd: int, buffer_size: int, buffer_bytes: int):
+        self._fd = fd
+        self._buffer_size = buffer_size
+        self._buffer_bytes = buffer_bytes
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="execution-log-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, event: ExecutionEvent):
+        """Enqueue an event for persistence."""
+        self._queue.put_nowait(event)
+
+    def flush(self):
+        """Block until every event submitted so far has been written."""
+        if self._thread.is_alive():
+            written = threading.Event()
+            self._queue.put_nowait(written)
+            written.wait()
+
+    def sync(self):
+        """Write all pending events and force them to stable storage."""
+        self.flush()
+        os.fsync(self._fd)
+
+    def close(self):
+        """Write all pending events, stop the writer thread and close the file."""
+        if self._thread.is_alive():
+            self._queue.put_nowait(self._STOP)
+            self._thread.join()
+        os.close(self._fd)
+
+    def _run(self):
+        buffer = bytearray()
+        pending = 0
+        while True:
+            item = self._queue.get()
+            while True:
+                if isinstance(item, ExecutionEvent):
+                    try:
+                        buffer += dumps_json(_event_dict(item))
+                        buffer += b'\n'
+                        pending += 1
+                    except Exception as e:
+                        logger.error(f"Failed to write event to log file: {e}")
+                    if pending < self._buffer_size and len(buffer) < self._buffer_bytes:
+                        try:
+                            item = self._queue.get_nowait()
+                            continue
+                        except queue.Empty:
+                            pass
+                self._write(buffer)
+                pending = 0
+                break
+
+            if item is self._STOP:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def _write(self, buffer: bytearray):
+        if buffer:
+            try:
+                # os.write may write only part of the buffer; loop until all is out
+                with memoryview(buffer) as view:
+                    written = 0
+                    while written < len(view):
+                        written += os.write(self._fd, view[written:])
+            except Exception as e:
+                logger.error(f"Failed to flush log file: {e}")
+            buffer.clear()
 
 
 class ExecutionLogger:
@@ -33,26 +209,63 @@ class ExecutionLogger:
     def __init__(
         self,
         log_file: Optional[str] = None,
-        auto_flush: bool = True,
+        auto_flush: bool = False,
         console_output: bool = False,
-        buffer_size: int = 100
+        buffer_size: int = 100,
+        buffer_bytes: int = 64 * 1024,
+        max_memory_events: Optional[int] = None,
+        retain_events: Literal['all', 'errors', 'none'] = 'all',
+        capture_result_size: bool = True
     ):
         """
         Initialize ExecutionLogger.
 
         Args:
             log_file: Optional path to JSONL log file for persistent storage
-            auto_flush: Whether to flush to file after each event
+            auto_flush: Whether to wait for each event to reach the file before
+                returning (durable mode); by default writes are batched
             console_output: Whether to also log events to console
-            buffer_size: Maximum number of events to buffer before forced flush
+            buffer_size: Maximum number of events to buffer before writing to file
+            buffer_bytes: Number of serialized bytes to buffer before writing to file
+            max_memory_events: Optional cap on events held in memory; when it is
+                reached the oldest half is spilled to a temporary JSONL file
+            retain_events: Which events to keep in memory: 'all', only 'errors'
+                (ERROR/CRITICAL level), or 'none' when only ``log_file`` is needed
+            capture_result_size: Whether to record each tool result's size as
+                the length of its string form. Turning it off skips that
+                O(result) stringification: non-string results get a bounded
+                preview and no ``result_size``
+
+        Events destined for ``log_file`` are serialized and written by a
+        background thread; call ``flush()`` to wait for them to reach disk.
+        Spilled events are no longer in ``events`` but are still returned by
+        ``iter_event_dicts()`` and written by ``export_events``; the ``get_*``
+        queries only see the events still held in memory.
         """
+        if retain_events not in ('all', 'errors', 'none'):
+            raise ValueError(f"Unsupported retain_events value: {retain_events}")
+
         self.events: List[ExecutionEvent] = []
+        self.retain_events = retain_events
+        self.capture_result_size = capture_result_size
         self.log_file = Path(log_file) if log_file else None
         self.auto_flush = auto_flush
         self.console_output = console_output
         self.buffer_size = buffer_size
-        self._file_handle: Optional[TextIO] = None
+        self.buffer_bytes = buffer_bytes
+        self._sink: Optional[_LogSink] = None
         self._events_since_flush = 0
+        self._atexit_flush = None
+        self.max_memory_events = max_memory_events
+        self._spill_path: Optional[Path] = None
+        self._spilled_count = 0
+        self._tool_call_counter = itertools.count()
+
+        # Indexes kept in step with self.events: events per exact class, and
+        # event timestamps (bisectable while they arrive in order)
+        self._events_by_type: Dict[type, List[ExecutionEvent]] = {}
+        self._timestamps: List[float] = []
+        self._timestamps_sorted = True
 
         # Statistics
         self._start_time = time.time()
@@ -75,19 +288,29 @@ class ExecutionLogger:
                 # Ensure parent directory exists
                 self.log_file.parent.mkdir(parents=True, exist_ok=True)
 
-                # Open in append mode
-                self._file_handle = open(self.log_file, 'a', encoding='utf-8')
+                # Unbuffered append-mode descriptor; the sink thread batches the writes
+                self._sink = _LogSink(
+                    os.open(self.log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644),
+                    buffer_size=self.buffer_size,
+                    buffer_bytes=self.buffer_bytes
+                )
+                # A per-instance partial so unregistering only removes this logger's hook
+                self._atexit_flush = partial(_flush_at_exit, weakref.ref(self))
+                atexit.register(self._atexit_flush)
                 logger.debug(f"Opened execution log file: {self.log_file}")
             except Exception as e:
                 logger.error(f"Failed to open log file {self.log_file}: {e}")
-                self._file_handle = None
+                self._sink = None
 
     def _close_log_file(self):
         """Close the log file."""
-        if self._file_handle:
+        if self._sink:
             try:
-                self._file_handle.close()
-                self._file_handle = None
+                self._sink.close()
+                self._sink = None
+                if self._atexit_flush is not None:
+                    atexit.unregister(self._atexit_flush)
+                    self._atexit_flush = None
                 logger.debug(f"Closed execution log file: {self.log_file}")
             except Exception as e:
                 logger.error(f"Error closing log file: {e}")
@@ -99,68 +322,137 @@ class ExecutionLogger:
         Args:
             event: The ExecutionEvent to log
         """
-        # Add to memory buffer
-        self.events.append(event)
+        # Add to memory buffer, spilling the oldest half once it is full
+        retain_events = self.retain_events
+        if retain_events == 'all' or (retain_events == 'errors' and event.level in _ERROR_LEVELS):
+            self.events.append(event)
+            self._index_event(event)
+            if self.max_memory_events and len(self.events) >= self.max_memory_events:
+                self._spill_events(len(self.events) // 2)
 
         # Update statistics
-        self._event_counts['total'] += 1
-        if isinstance(event, ToolExecutionEvent):
-            self._event_counts['tool_executions'] += 1
-            if not event.success:
-                self._event_counts['errors'] += 1
-        elif isinstance(event, StateChangeEvent):
-            self._event_counts['state_changes'] += 1
-        elif isinstance(event, ContextReductionEvent):
-            self._event_counts['context_reductions'] += 1
-
-        if event.level in [LogLevel.ERROR, LogLevel.CRITICAL]:
-            self._event_counts['errors'] += 1
+        event_counts = self._event_counts
+        event_counts['total'] += 1
+        counter_key = _COUNTER_KEYS.get(type(event))
+        if counter_key is not None:
+            event_counts[counter_key] += 1
+            if counter_key == 'tool_executions' and not event.success:
+                event_counts['errors'] += 1
+
+        if event.level in _ERROR_LEVELS:
+            event_counts['errors'] += 1
 
         # Console output if enabled
         if self.console_output:
             self._log_to_console(event)
 
-        # Write to file if enabled
-        if self._file_handle:
-            self._write_event_to_file(event)
+        # Hand off to the background writer if enabled
+        if self._sink:
+            self._sink.submit(event)
 
-        # Auto-flush if needed
+        # Auto-flush if needed; otherwise the sink batches writes on its own
         self._events_since_flush += 1
-        if self.auto_flush or self._events_since_flush >= self.buffer_size:
+        if self.auto_flush:
             self.flush()
 
+    def _index_event(self, event: ExecutionEvent):
+        """Record an event just appended to ``events`` in the lookup indexes."""
+        event_class = type(event)
+        bucket = self._events_by_type.get(event_class)
+        if bucket is None:
+            bucket = self._events_by_type[event_class] = []
+        bucket.append(event)
+
+        timestamp = event.timestamp
+        if self._timestamps and timestamp < self._timestamps[-1]:
+            self._timestamps_sorted = False
+        self._timestamps.append(timestamp)
+
     def _log_to_console(self, event: ExecutionEvent):
         """Log event to console using loguru."""
-        level_map = {
-            LogLevel.DEBUG: logger.debug,
-            LogLevel.INFO: logger.info,
-            LogLevel.WARNING: logger.warning,
-            LogLevel.ERROR: logger.error,
-            LogLevel.CRITICAL: logger.critical
-        }
+        # Pass the parts as arguments: loguru skips formatting for levels no sink accepts
+        logger.log(
+            _CONSOLE_LEVELS.get(event.level, "INFO"),
+            "[{}] {}",
+            event.source,
+            event.message
+        )
 
-        log_func = level_map.get(event.level, logger.info)
-        log_func(f"[{event.source}] {event.message}")
+    def _spill_events(self, count: int):
+        """Move the oldest ``count`` events from memory to the spill file."""
+        try:
+            if self._spill_path is None:
+                fd, path = tempfile.mkstemp(prefix='tau2_events_', suffix='.jsonl')
+                os.close(fd)
+                self._spill_path = Path(path)
+
+            payload = bytearray()
+            spilled_by_type = Counter()
+            for event in self.events[:count]:
+                payload += dumps_json(_event_dict(event))
+                payload += b'\n'
+                spilled_by_type[type(event)] += 1
+            with open(self._spill_path, 'ab') as f:
+                f.write(payload)
+
+            # The spilled events are the oldest, so they lead every index too
+            del self.events[:count]
+            del self._timestamps[:count]
+            for event_class, spilled in spilled_by_type.items():
+                del self._events_by_type[event_class][:spilled]
+            self._spilled_count += count
+            logger.debug(f"Spilled {count} events to {self._spill_path}")
+        except Exception as e:
+            logger.error(f"Failed to spill events to disk: {e}")
 
-    def _write_event_to_file(self, event: ExecutionEvent):
-        """Write a single event to the JSONL file."""
-        if self._file_handle:
+    def _remove_spill_file(self):
+        """Delete the spill file, discarding any spilled events."""
+        if self._spill_path is not None:
             try:
-                event_dict = event.to_dict()
-                json_line = json.dumps(event_dict, default=str) + '\n'
-                self._file_handle.write(json_line)
+                self._spill_path.unlink(missing_ok=True)
             except Exception as e:
-                logger.error(f"Failed to write event to log file: {e}")
+                logger.error(f"Failed to remove spill file {self._spill_path}: {e}")
+            self._spill_path = None
+            self._spilled_count = 0
+
+    def iter_event_dicts(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every logged event as a (read-only) dictionary, spilled events first.
+
+        Dictionaries built here are not memoized on the events, so streaming
+        every event once does not leave a dict per event alive afterwards.
+        """
+        if self._spill_path is not None:
+            with open(self._spill_path, 'rb') as f:
+                for line in f:
+                    yield loads_json(line)
+        for event in self.events:
+            event_dict = event._cached_dict
+            yield event.to_dict() if event_dict is None else event_dict
 
     def flush(self):
         """Flush any buffered data to file."""
-        if self._file_handle:
+        if self._sink:
             try:
-                self._file_handle.flush()
+                self._sink.flush()
                 self._events_since_flush = 0
             except Exception as e:
                 logger.error(f"Failed to flush log file: {e}")
 
+    def close(self):
+        """Flush buffered data and close the log file."""
+        self.flush()
+        self._close_log_file()
+
+    def sync(self):
+        """Flush buffered data and force it to stable storage (fsync)."""
+        if self._sink:
+            try:
+                self._sink.sync()
+                self._events_since_flush = 0
+            except Exception as e:
+                logger.error(f"Failed to sync log file: {e}")
+
     def log_tool_execution(
         self,
         tool_name: str,
@@ -174,7 +466,7 @@ class ExecutionLogger:
         tool_call_id: Optional[str] = None,
         validation_errors: Optional[List[str]] = None,
         state_changed: bool = False
-    ):
+    ) -> ToolExecutionEvent:
         """
         Convenience method to log a tool execution event.
 
@@ -190,22 +482,20 @@ class ExecutionLogger:
             tool_call_id: Unique identifier for this tool call
             validation_errors: List of validation errors
             state_changed: Whether the tool call changed the environment state
+
+        Returns:
+            The logged ToolExecutionEvent
         """
         # Generate tool_call_id if not provided
         if tool_call_id is None:
-            tool_call_id = f"{tool_name}_{len(self.events)}"
+            tool_call_id = f"{tool_name}_{next(self._tool_call_counter)}"
 
         # Generate result preview
-        result_preview = ""
-        result_size = None
-        if result is not None:
-            result_str = str(result)
-            result_preview = result_str[:200]
-            result_size = len(result_str)
+        result_preview, result_size = _summarize_result(result, self.capture_result_size)
 
         event = ToolExecutionEvent(
             tool_name=tool_name,
-            tool_args=tool_args or {},
+            tool_args=tool_args,
             execution_time=execution_time,
             success=success,
             error_message=error_message,
@@ -215,11 +505,12 @@ class ExecutionLogger:
             result_preview=result_preview,
             requestor=requestor,
             tool_call_id=tool_call_id,
-            validation_errors=validation_errors or [],
+            validation_errors=validation_errors,
             state_changed=state_changed
         )
 
         self.log_event(event)
+        return event
 
     def log_state_change(
         self,
@@ -277,7 +568,7 @@ class ExecutionLogger:
             reduced_tokens=reduced_tokens,
             strategy_used=strategy_used,
             trigger_reason=trigger_reason,
-            warnings=warnings or [],
+            warnings=warnings,
             context_type=context_type
         )
 
@@ -312,8 +603,23 @@ class ExecutionLogger:
 
         self.log_event(event)
 
+    def _require_retained_events(self):
+        """Raise if events are not kept in memory, so queries cannot silently return nothing."""
+        if self.retain_events == 'none':
+            raise RuntimeError("Events are not retained in memory (retain_events='none')")
+
     def get_events_by_type(self, event_type: type) -> List[ExecutionEvent]:
         """Get all events of a specific type."""
+        self._require_retained_events()
+        matching = [
+            bucket for event_class, bucket in self._events_by_type.items()
+            if issubclass(event_class, event_type)
+        ]
+        if not matching:
+            return []
+        if len(matching) == 1:
+            return list(matching[0])
+        # Several classes match; scan to keep the events in logging order
         return [event for event in self.events if isinstance(event, event_type)]
 
     def get_tool_execution_events(self) -> List[ToolExecutionEvent]:
@@ -334,6 +640,15 @@ class ExecutionLogger:
         end_time: float
     ) -> List[ExecutionEvent]:
         """Get events within a specific time range."""
+        self._require_retained_events()
+        return self._events_in_time_range(start_time, end_time)
+
+    def _events_in_time_range(self, start_time: float, end_time: float) -> List[ExecutionEvent]:
+        """Select events by timestamp, bisecting while timestamps are in order."""
+        if self._timestamps_sorted:
+            start = bisect_left(self._timestamps, start_time)
+            end = bisect_right(self._timestamps, end_time)
+            return self.events[start:end]
         return [
             event for event in self.events
             if start_time <= event.timestamp <= end_time
@@ -350,6 +665,7 @@ class ExecutionLogger:
             'total_events': len(self.events),
             'event_counts': self._event_counts.copy(),
             'memory_events': len(self.events),
+            'spilled_events': self._spilled_count,
             'log_file': str(self.log_file) if self.log_file else None,
             'auto_flush': self.auto_flush,
             'events_since_flush': self._events_since_flush
@@ -371,78 +687,132 @@ class ExecutionLogger:
             time_range: Optional (start_time, end_time) tuple to filter events
             format: Export format ('json', 'jsonl', or 'csv')
         """
-        # Filter events
+        # Filter events, narrowing by time first so the type filter sees only the window
         events_to_export = self.events
-
-        if event_types:
-            events_to_export = [
-                event for event in events_to_export
-                if any(isinstance(event, event_type) for event_type in event_types)
-            ]
+        requested_types = tuple(event_types) if event_types else None
+        type_filter = requested_types
 
         if time_range:
             start_time, end_time = time_range
+            if self._timestamps_sorted:
+                events_to_export = self._events_in_time_range(start_time, end_time)
+            else:
+                # No usable index; apply both filters in a single pass
+                events_to_export = [
+                    event for event in events_to_export
+                    if start_time <= event.timestamp <= end_time
+                    and (type_filter is None or isinstance(event, type_filter))
+                ]
+                type_filter = None
+
+        if type_filter:
             events_to_export = [
-                event for event in events_to_export
-                if start_time <= event.timestamp <= end_time
+                event for event in events_to_export if isinstance(event, type_filter)
             ]
 
+        def iter_export_dicts() -> Iterator[Dict[str, Any]]:
+            # Spilled events are older than everything still in memory
+            yield from self._iter_spilled_event_dicts(requested_types, time_range)
+            for event in events_to_export:
+                yield _event_dict(event)
+
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         try:
             if format.lower() == 'json':
-                self._export_json(events_to_export, output_path)
+                exported = self._export_json(iter_export_dicts(), output_path)
             elif format.lower() == 'jsonl':
-                self._export_jsonl(events_to_export, output_path)
+                exported = self._export_jsonl(iter_export_dicts(), output_path)
             elif format.lower() == 'csv':
-                self._export_csv(events_to_export, output_path)
+                exported = self._export_csv(iter_export_dicts, output_path)
             else:
                 raise ValueError(f"Unsupported export format: {format}")
 
-            logger.info(f"Exported {len(events_to_export)} events to {output_path}")
+            logger.info(f"Exported {exported} events to {output_path}")
 
         except Exception as e:
             logger.error(f"Failed to export events: {e}")
             raise
 
-    def _export_json(self, events: List[ExecutionEvent], output_path: Path):
+    def _iter_spilled_event_dicts(
+        self,
+        event_types: Optional[tuple[type, ...]] = None,
+        time_range: Optional[tuple[float, float]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield spilled events as dictionaries, applying the export filters.
+
+        Args:
+            event_types: Optional event classes to keep (subclasses included)
+            time_range: Optional (start_time, end_time) tuple to filter events
+        """
+        if self._spill_path is None:
+            return
+        with open(self._spill_path, 'rb') as f:
+            for line in f:
+                event_dict = loads_json(line)
+                if time_range is not None:
+                    start_time, end_time = time_range
+                    if not start_time <= event_dict.get('timestamp', 0) <= end_time:
+                        continue
+                if event_types is not None:
+                    event_class = EVENT_TYPE_MAP.get(event_dict.get('event_type'), ExecutionEvent)
+                    if not issubclass(event_class, event_types):
+                        continue
+                yield event_dict
+
+    def _export_json(self, event_dicts: Iterable[Dict[str, Any]], output_path: Path) -> int:
         """Export events as a single JSON array."""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            event_dicts = [event.to_dict() for event in events]
-            json.dump({
-                'events': event_dicts,
-                'metadata': {
-                    'export_timestamp': time.time(),
-                    'total_events': len(event_dicts),
-                    'statistics': self.get_statistics()
-                }
-            }, f, indent=2, default=str)
-
-    def _export_jsonl(self, events: List[ExecutionEvent], output_path: Path):
+        event_dicts = list(event_dicts)
+        output_path.write_bytes(dumps_json({
+            'events': event_dicts,
+            'metadata': {
+                'export_timestamp': time.time(),
+                'total_events': len(event_dicts),
+                'statistics': self.get_statistics()
+            }
+        }, pretty=True))
+        return len(event_dicts)
+
+    def _export_jsonl(self, event_dicts: Iterable[Dict[str, Any]], output_path: Path) -> int:
         """Export events as JSONL (one JSON object per line)."""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for event in events:
-                event_dict = event.to_dict()
-                json_line = json.dumps(event_dict, default=str) + '\n'
-                f.write(json_line)
-
-    def _export_csv(self, events: List[ExecutionEvent], output_path: Path):
-        """Export events as CSV."""
-        import pandas as pd
-
-        # Convert events to flat dictionaries
-        event_dicts = []
-        for event in events:
-            event_dict = event.to_dict()
-            # Flatten metadata
-            metadata = event_dict.pop('metadata', {})
-            for key, value in metadata.items():
-                event_dict[f'metadata_{key}'] = value
-            event_dicts.append(event_dict)
-
-        df = pd.DataFrame(event_dicts)
-        df.to_csv(output_path, index=False)
+        return write_jsonl(output_path, event_dicts)
+
+    def _export_csv(
+        self,
+        iter_event_dicts: Callable[[], Iterable[Dict[str, Any]]],
+        output_path: Path
+    ) -> int:
+        """
+        Export events as CSV, streaming one row per event.
+
+        ``iter_event_dicts`` is called twice, once to collect the header and
+        once to write the rows, so no full list of rows is built.
+        """
+
+        def flat_items(event_dict: Dict[str, Any]):
+            # Event fields followed by flattened metadata, without copying the dict
+            for key, value in event_dict.items():
+                if key != 'metadata':
+                    yield key, value
+            for key, value in (event_dict.get('metadata') or {}).items():
+                yield f'metadata_{key}', value
+
+        # Header: every column in order of first appearance
+        header = {}
+        for event_dict in iter_event_dicts():
+            for key, _ in flat_items(event_dict):
+                header.setdefault(key, None)
+
+        exported = 0
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(header))
+            writer.writeheader()
+            for event_dict in iter_event_dicts():
+                writer.writerow(dict(flat_items(event_dict)))
+                exported += 1
+        return exported
 
     def load_events_from_file(self, input_file: Union[str, Path]):
         """
@@ -457,20 +827,18 @@ class ExecutionLogger:
             raise FileNotFoundError(f"Log file not found: {input_path}")
 
         try:
-            with open(input_path, 'r', encoding='utf-8') as f:
+            with open(input_path, 'rb') as f:
                 if input_path.suffix == '.json':
                     # JSON format
-                    data = json.load(f)
+                    data = loads_json(f.read())
                     if isinstance(data, dict) and 'events' in data:
                         event_dicts = data['events']
                     else:
                         event_dicts = data if isinstance(data, list) else [data]
                 else:
-                    # JSONL format
-                    event_dicts = []
-                    for line in f:
-                        if line.strip():
-                            event_dicts.append(json.loads(line))
+                    # JSONL format: undecoded byte lines straight into the parser;
+                    # lines read from a file are never empty, so skip whitespace-only ones
+                    event_dicts = [loads_json(line) for line in f if not line.isspace()]
 
             # Convert dictionaries to event objects
             loaded_events = []
@@ -483,7 +851,9 @@ class ExecutionLogger:
                     continue
 
             # Add to current events
-            self.events.extend(loaded_events)
+            for event in loaded_events:
+                self.events.append(event)
+                self._index_event(event)
             logger.info(f"Loaded {len(loaded_events)} events from {input_path}")
 
         except Exception as e:
@@ -493,6 +863,10 @@ class ExecutionLogger:
     def clear_events(self):
         """Clear all events from memory."""
         self.events.clear()
+        self._events_by_type.clear()
+        self._timestamps.clear()
+        self._timestamps_sorted = True
+        self._remove_spill_file()
         self._events_since_flush = 0
         logger.debug("Cleared all events from ExecutionLogger")
 
@@ -504,7 +878,9 @@ class ExecutionLogger:
         """Context manager exit."""
         self.flush()
         self._close_log_file()
+        self._remove_spill_file()
 
     def __del__(self):
-        """Destructor to ensure file is closed."""
-        self._close_log_file()
\ No newline at end of file
+        """Destructor to ensure files are closed and spilled events removed."""
+        self._close_log_file()
+        self._remove_spill_file()
\ No newline at end of file
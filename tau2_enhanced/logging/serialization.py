@@ -0,0 +1,138 @@
+"""
+JSON serialization helpers for the enhanced logging system.
+
+Uses orjson when it is installed (``pip install tau2-enhanced[performance]``)
+and falls back to the standard library json module otherwise. Values that are
+not natively serializable are converted with ``str``, matching the
+``default=str`` convention used throughout the logging package.
+"""
+
+import json
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Records encoded before each write call when streaming JSONL
+_WRITE_BATCH = 64
+
+
+def dumps_json(obj: Any, pretty: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON.
+
+    Args:
+        obj: Object to serialize
+        pretty: Whether to indent the output by two spaces
+        sort_keys: Whether to sort dictionary keys (canonical output for hashing)
+
+    Returns:
+        Encoded JSON document
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=str, option=option)
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers beyond 64 bits; let the stdlib handle it
+
+    # Match orjson's output: UTF-8 rather than \u escapes, compact unless pretty
+    if pretty:
+        return json.dumps(
+            obj, default=str, ensure_ascii=False, indent=2, sort_keys=sort_keys
+        ).encode('utf-8')
+    return json.dumps(
+        obj, default=str, ensure_ascii=False, separators=(',', ':'), sort_keys=sort_keys
+    ).encode('utf-8')
+
+
+def loads_json(data: bytes | str) -> Any:
+    """
+    Deserialize a JSON document.
+
+    Args:
+        data: Encoded JSON document (bytes or str)
+
+    Returns:
+        Decoded object
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_jsonl(path: str | Path, records: Iterable[Any]) -> int:
+    """
+    Stream records to a JSONL file, one compact JSON document per line.
+
+    Records are encoded one at a time and written in batches of
+    ``_WRITE_BATCH`` lines, so the full output is never held in memory.
+
+    Args:
+        path: Output file path
+        records: Iterable of objects to serialize
+
+    Returns:
+        Number of records written
+    """
+    count = 0
+    lines = []
+    with open(path, 'wb') as f:
+        for record in records:
+            lines.append(dumps_json(record))
+            count += 1
+            if len(lines) == _WRITE_BATCH:
+                lines.append(b'')  # trailing newline for the last line
+                f.write(b'\n'.join(lines))
+                lines.clear()
+        if lines:
+            lines.append(b'')
+            f.write(b'\n'.join(lines))
+    return count
+
+
+def write_json_records(
+    path: str | Path,
+    records_key: str,
+    records: Iterable[Any],
+    extra: dict[str, Any]
+) -> int:
+    """
+    Stream a pretty-printed JSON object holding a list of records.
+
+    Produces the same document as ``dumps_json({records_key: list(records),
+    **extra}, pretty=True)``, but encodes and writes the records one at a
+    time, so the full list is never held in memory.
+
+    Args:
+        path: Output file path
+        records_key: Key of the records list (written first)
+        records: Iterable of objects to serialize
+        extra: Remaining top-level keys, written after the records
+
+    Returns:
+        Number of records written
+    """
+    count = 0
+    with open(path, 'wb') as f:
+        f.write(b'{\n  ' + dumps_json(records_key) + b': [')
+        for record in records:
+            f.write(b',\n    ' if count else b'\n    ')
+            # JSON strings never contain raw newlines, so re-indenting is safe
+            f.write(dumps_json(record, pretty=True).replace(b'\n', b'\n    '))
+            count += 1
+        f.write(b'\n  ]' if count else b']')
+        for key, value in extra.items():
+            f.write(b',\n  ' + dumps_json(key) + b': ')
+            f.write(dumps_json(value, pretty=True).replace(b'\n', b'\n  '))
+        f.write(b'\n}')
+    return count
@@ -5,16 +5,27 @@ This module provides the StateTracker class that handles environment state
 monitoring, snapshot creation, and state change detection.
 """
 
+import hashlib
+import sys
 import time
-import json
+from collections import deque
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union, Set
+from typing import Dict, Iterator, List, Any, Optional, Union, Set
 from dataclasses import dataclass, field
 
 from loguru import logger
 
+from .serialization import dumps_json, loads_json, write_json_records, write_jsonl
 
-@dataclass
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+
+@dataclass(slots=True)
 class StateSnapshot:
     """Snapshot of environment state at a specific point in time."""
 
@@ -27,6 +38,9 @@ class StateSnapshot:
     state_hash: Optional[str] = None
     action_trigger: str = ""
 
+    # Dictionary form memoized by StateTracker for repeated exports
+    _cached_dict: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+
     def to_dict(self) -> Dict[str, Any]:
         """Convert snapshot to dictionary for serialization."""
         return {
@@ -46,7 +60,33 @@ class StateSnapshot:
         return cls(**data)
 
 
-@dataclass
+# Sentinel for keys missing from a state dict (None is a valid state value)
+_MISSING = object()
+
+
+def _snapshot_size(snapshot: StateSnapshot) -> int:
+    """Shallow size estimate of a snapshot and its state/metadata dicts, in bytes."""
+    return (
+        sys.getsizeof(snapshot)
+        + sys.getsizeof(snapshot.state_data)
+        + sys.getsizeof(snapshot.metadata)
+    )
+
+
+def _snapshot_dict(snapshot: StateSnapshot) -> Dict[str, Any]:
+    """
+    Return a snapshot's dictionary form, building it at most once.
+
+    The returned dict is shared between exports and must be treated as
+    read-only.
+    """
+    snapshot_dict = snapshot._cached_dict
+    if snapshot_dict is None:
+        snapshot_dict = snapshot._cached_dict = snapshot.to_dict()
+    return snapshot_dict
+
+
+@dataclass(slots=True)
 class StateDiff:
     """Difference between two state snapshots."""
 
@@ -97,21 +137,28 @@ class StateTracker:
             track_state_hash: Whether to compute and track state hashes
             snapshot_triggers: List of actions that trigger snapshots
         """
-        self.snapshots: List[StateSnapshot] = []
+        # Ring buffer: appending past max_snapshots evicts the oldest in O(1)
+        self.snapshots: deque[StateSnapshot] = deque(maxlen=max_snapshots)
         self.max_snapshots = max_snapshots
         self.auto_snapshot = auto_snapshot
         self.track_state_hash = track_state_hash
-        self.snapshot_triggers = snapshot_triggers or [
+        self.snapshot_triggers = frozenset(snapshot_triggers or (
             'tool_execution',
             'state_change',
             'step_start',
             'step_end'
-        ]
+        ))
 
         # State tracking
         self._current_step = 0
         self._last_hash = None
         self._state_change_count = 0
+        self._approx_bytes = 0  # running shallow size of the stored snapshots
+        self._step_index: Dict[int, StateSnapshot] = {}  # latest stored snapshot per step
+
+    def is_trigger(self, action: str) -> bool:
+        """Check whether an action is configured to trigger snapshots."""
+        return action in self.snapshot_triggers
 
     def create_snapshot(
         self,
@@ -119,7 +166,10 @@ class StateTracker:
         action_trigger: str = "",
         agent_turn: bool = True,
         context_size: int = 0,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[float] = None,
+        state_hash: Optional[str] = None,
+        copy_state: bool = True
     ) -> StateSnapshot:
         """
         Create a state snapshot.
@@ -130,40 +180,127 @@ class StateTracker:
             agent_turn: Whether it's currently the agent's turn
             context_size: Size of current context
             metadata: Additional metadata
+            timestamp: Snapshot time (defaults to now)
+            state_hash: Precomputed hash of ``state_data`` (computed if omitted)
+            copy_state: Whether to copy ``state_data`` and ``metadata``; pass False
+                when the caller will not mutate them afterwards
+
+        Returns:
+            Created StateSnapshot
+        """
+        # Compute state hash if enabled and not already known
+        if not self.track_state_hash:
+            state_hash = None
+        elif state_hash is None:
+            state_hash = self._compute_state_hash(state_data)
+
+        if copy_state:
+            state_data = state_data.copy() if state_data else {}
+            metadata = metadata.copy() if metadata else {}
+        else:
+            state_data = state_data if state_data is not None else {}
+            metadata = metadata if metadata is not None else {}
+
+        snapshot = StateSnapshot(
+            timestamp=time.time() if timestamp is None else timestamp,
+            step_number=self._current_step,
+            agent_turn=agent_turn,
+            state_data=state_data,
+            context_size=context_size,
+            metadata=metadata,
+            state_hash=state_hash,
+            action_trigger=action_trigger
+        )
+
+        return self._add_snapshot(snapshot)
+
+    def create_delta_snapshot(
+        self,
+        pre_state_data: Dict[str, Any],
+        post_state_data: Dict[str, Any],
+        action_trigger: str = "",
+        agent_turn: bool = True,
+        context_size: int = 0,
+        metadata: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[float] = None
+    ) -> StateSnapshot:
+        """
+        Create a single snapshot recording only what changed between two states.
+
+        The snapshot's ``state_data`` holds the keys that were added or whose
+        values changed; removed keys are listed in ``metadata['removed_keys']``.
+        Its ``state_hash`` is the hash of the full post state, and the pre-state
+        hash is kept in ``metadata['pre_state_hash']``.
+
+        Args:
+            pre_state_data: State before the action
+            post_state_data: State after the action
+            action_trigger: Action that caused the change
+            agent_turn: Whether it's currently the agent's turn
+            context_size: Size of current context
+            metadata: Additional metadata
+            timestamp: Snapshot time (defaults to now)
 
         Returns:
             Created StateSnapshot
         """
-        # Compute state hash if enabled
+        changed = {
+            key: value for key, value in post_state_data.items()
+            if key not in pre_state_data or pre_state_data[key] != value
+        }
+        removed_keys = [key for key in pre_state_data if key not in post_state_data]
+
+        snapshot_metadata = dict(metadata) if metadata else {}
+        snapshot_metadata['delta'] = True
+        if removed_keys:
+            snapshot_metadata['removed_keys'] = removed_keys
+
         state_hash = None
         if self.track_state_hash:
-            state_hash = self._compute_state_hash(state_data)
+            snapshot_metadata['pre_state_hash'] = self._compute_state_hash(pre_state_data)
+            state_hash = self._compute_state_hash(post_state_data)
 
         snapshot = StateSnapshot(
+            timestamp=time.time() if timestamp is None else timestamp,
             step_number=self._current_step,
             agent_turn=agent_turn,
-            state_data=state_data.copy() if state_data else {},
+            state_data=changed,
             context_size=context_size,
-            metadata=metadata.copy() if metadata else {},
+            metadata=snapshot_metadata,
             state_hash=state_hash,
             action_trigger=action_trigger
         )
 
-        # Add to snapshots list
-        self.snapshots.append(snapshot)
+        return self._add_snapshot(snapshot)
 
-        # Maintain max snapshots limit
-        if len(self.snapshots) > self.max_snapshots:
-            self.snapshots.pop(0)
+    def _add_snapshot(self, snapshot: StateSnapshot) -> StateSnapshot:
+        """Store a snapshot, enforce the size limit and update change tracking."""
+        self._store_snapshot(snapshot)
 
         # Update tracking
+        state_hash = snapshot.state_hash
         if state_hash and state_hash != self._last_hash:
             self._state_change_count += 1
             self._last_hash = state_hash
 
-        logger.debug(f"Created state snapshot: step={self._current_step}, trigger={action_trigger}")
+        logger.debug(f"Created state snapshot: step={self._current_step}, trigger={snapshot.action_trigger}")
         return snapshot
 
+    def _store_snapshot(self, snapshot: StateSnapshot):
+        """Append a snapshot, keeping the running size estimate in step with evictions."""
+        snapshots = self.snapshots
+        step_index = self._step_index
+        # The deque drops the oldest snapshot once max_snapshots is reached
+        if snapshots and len(snapshots) == snapshots.maxlen:
+            evicted = snapshots[0]
+            self._approx_bytes -= _snapshot_size(evicted)
+            if step_index.get(evicted.step_number) is evicted:
+                del step_index[evicted.step_number]
+        snapshots.append(snapshot)
+        if snapshots and snapshots[-1] is snapshot:
+            self._approx_bytes += _snapshot_size(snapshot)
+            step_index[snapshot.step_number] = snapshot
+
     def snapshot_if_changed(
         self,
         state_data: Dict[str, Any],
@@ -188,7 +325,8 @@ class StateTracker:
         current_hash = self._compute_state_hash(state_data)
 
         if current_hash != self._last_hash:
-            return self.create_snapshot(state_data, action_trigger, **kwargs)
+            # Reuse the hash rather than serializing the state a second time
+            return self.create_snapshot(state_data, action_trigger, state_hash=current_hash, **kwargs)
 
         return None
 
@@ -202,26 +340,36 @@ class StateTracker:
         """
         Track state changes during tool execution.
 
+        ``pre_state`` and ``post_state`` are stored without copying, so the
+        snapshots alias them: the caller must not mutate either dict
+        afterwards, or the recorded history (and its memoized dict form)
+        changes with it. Each snapshot gets its own copy of ``metadata``.
+
         Args:
             tool_name: Name of the executed tool
-            pre_state: State before tool execution
-            post_state: State after tool execution
-            **kwargs: Additional snapshot metadata
+            pre_state: State before tool execution (not copied)
+            post_state: State after tool execution (not copied)
+            **kwargs: Additional create_snapshot arguments, e.g. metadata
 
         Returns:
             StateDiff if state changed, None otherwise
         """
-        # Create pre-execution snapshot
+        metadata = kwargs.pop('metadata', None)
+
+        # Create pre- and post-execution snapshots without copying the states
         pre_snapshot = self.create_snapshot(
             pre_state,
             action_trigger=f"before_{tool_name}",
+            metadata=dict(metadata) if metadata else {},
+            copy_state=False,
             **kwargs
         )
 
-        # Create post-execution snapshot
         post_snapshot = self.create_snapshot(
             post_state,
             action_trigger=f"after_{tool_name}",
+            metadata=dict(metadata) if metadata else {},
+            copy_state=False,
             **kwargs
         )
 
@@ -259,22 +407,36 @@ class StateTracker:
         from_data = from_snapshot.state_data
         to_data = to_snapshot.state_data
 
-        # Find additions, deletions, and modifications
-        from_keys = set(from_data.keys())
-        to_keys = set(to_data.keys())
-
-        diff.additions = to_keys - from_keys
-        diff.deletions = from_keys - to_keys
-        common_keys = from_keys & to_keys
-
-        # Check for modifications in common keys
-        for key in common_keys:
-            if from_data[key] != to_data[key]:
-                diff.modifications[key] = {
-                    'from': from_data[key],
-                    'to': to_data[key]
+        # Same object or same hash: nothing to compare key by key
+        from_hash = from_snapshot.state_hash
+        if from_data is to_data or (from_hash and from_hash == to_snapshot.state_hash):
+            diff.diff_summary = "no changes detected"
+            diff.changes = {
+                'additions_count': 0,
+                'deletions_count': 0,
+                'modifications_count': 0,
+                'summary': diff.diff_summary
+            }
+            return diff
+
+        # Find additions and modifications in one pass over the later state,
+        # with a single lookup into the earlier one per key
+        additions = diff.additions
+        modifications = diff.modifications
+        from_get = from_data.get
+        for key, to_value in to_data.items():
+            from_value = from_get(key, _MISSING)
+            if from_value is _MISSING:
+                additions.add(key)
+            elif from_value != to_value:
+                modifications[key] = {
+                    'from': from_value,
+                    'to': to_value
                 }
 
+        # Deletions straight from the key views, without intermediate key sets
+        diff.deletions = from_data.keys() - to_data.keys()
+
         # Create summary
         changes = []
         if diff.additions:
@@ -300,22 +462,26 @@ class StateTracker:
         """
         Compute a hash of the state data for change detection.
 
+        Uses the non-cryptographic xxh3 hash when xxhash is installed
+        (``pip install tau2-enhanced[performance]``) and MD5 otherwise.
+
         Args:
             state_data: State data to hash
 
         Returns:
             Hash string
         """
-        import hashlib
-
         try:
             # Sort keys for consistent hashing
-            state_str = json.dumps(state_data, sort_keys=True, default=str)
-            return hashlib.md5(state_str.encode()).hexdigest()
+            payload = dumps_json(state_data, sort_keys=True)
         except Exception as e:
             logger.warning(f"Failed to compute state hash: {e}")
             # Fallback: use string representation
-            return hashlib.md5(str(state_data).encode()).hexdigest()
+            payload = str(state_data).encode()
+
+        if XXHASH_AVAILABLE:
+            return xxhash.xxh3_64_hexdigest(payload)
+        return hashlib.md5(payload).hexdigest()
 
     def get_latest_snapshot(self) -> Optional[StateSnapshot]:
         """Get the most recent state snapshot."""
@@ -323,10 +489,7 @@ class StateTracker:
 
     def get_snapshot_by_step(self, step_number: int) -> Optional[StateSnapshot]:
         """Get snapshot for a specific step number."""
-        for snapshot in reversed(self.snapshots):
-            if snapshot.step_number == step_number:
-                return snapshot
-        return None
+        return self._step_index.get(step_number)
 
     def get_snapshots_in_range(
         self,
@@ -339,6 +502,18 @@ class StateTracker:
             if start_time <= snapshot.timestamp <= end_time
         ]
 
+    def iter_snapshot_dicts(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every snapshot as a (read-only) dictionary, oldest first.
+
+        Dictionaries built here are not memoized on the snapshots, so
+        streaming every snapshot once does not leave a dict per snapshot
+        alive afterwards.
+        """
+        for snapshot in self.snapshots:
+            snapshot_dict = snapshot._cached_dict
+            yield snapshot.to_dict() if snapshot_dict is None else snapshot_dict
+
     def get_state_changes(self) -> List[StateDiff]:
         """
         Get all state changes (diffs between consecutive snapshots).
@@ -347,10 +522,8 @@ class StateTracker:
             List of StateDiff objects
         """
         changes = []
-        for i in range(1, len(self.snapshots)):
-            prev_snapshot = self.snapshots[i - 1]
-            curr_snapshot = self.snapshots[i]
-
+        # Pair consecutive snapshots by iteration; deque indexing is O(n)
+        for prev_snapshot, curr_snapshot in zip(self.snapshots, islice(self.snapshots, 1, None)):
             if (self.track_state_hash and
                 prev_snapshot.state_hash != curr_snapshot.state_hash):
                 diff = self.create_state_diff(prev_snapshot, curr_snapshot)
@@ -367,8 +540,8 @@ class StateTracker:
             'max_snapshots': self.max_snapshots,
             'auto_snapshot': self.auto_snapshot,
             'track_state_hash': self.track_state_hash,
-            'snapshot_triggers': self.snapshot_triggers.copy(),
-            'memory_usage_mb': len(str(self.snapshots)) / (1024 * 1024),
+            'snapshot_triggers': sorted(self.snapshot_triggers),
+            'memory_usage_mb': max(self._approx_bytes, 0) / (1024 * 1024),
             'last_snapshot_time': self.snapshots[-1].timestamp if self.snapshots else None
         }
 
@@ -411,25 +584,23 @@ class StateTracker:
             raise
 
     def _export_snapshots_json(self, snapshots: List[StateSnapshot], output_path: Path):
-        """Export snapshots as a single JSON array."""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            snapshot_dicts = [snapshot.to_dict() for snapshot in snapshots]
-            json.dump({
-                'snapshots': snapshot_dicts,
+        """Export snapshots as a single JSON array, streamed one snapshot at a time."""
+        write_json_records(
+            output_path,
+            'snapshots',
+            (_snapshot_dict(snapshot) for snapshot in snapshots),
+            {
                 'metadata': {
                     'export_timestamp': time.time(),
-                    'total_snapshots': len(snapshot_dicts),
+                    'total_snapshots': len(snapshots),
                     'statistics': self.get_statistics()
                 }
-            }, f, indent=2, default=str)
+            }
+        )
 
     def _export_snapshots_jsonl(self, snapshots: List[StateSnapshot], output_path: Path):
         """Export snapshots as JSONL (one JSON object per line)."""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for snapshot in snapshots:
-                snapshot_dict = snapshot.to_dict()
-                json_line = json.dumps(snapshot_dict, default=str) + '\n'
-                f.write(json_line)
+        write_jsonl(output_path, (_snapshot_dict(snapshot) for snapshot in snapshots))
 
     def load_snapshots_from_file(self, input_file: Union[str, Path]):
         """
@@ -444,38 +615,38 @@ class StateTracker:
             raise FileNotFoundError(f"Snapshot file not found: {input_path}")
 
         try:
-            with open(input_path, 'r', encoding='utf-8') as f:
+            with open(input_path, 'rb') as f:
                 if input_path.suffix == '.json':
                     # JSON format
-                    data = json.load(f)
+                    data = loads_json(f.read())
                     if isinstance(data, dict) and 'snapshots' in data:
                         snapshot_dicts = data['snapshots']
                     else:
                         snapshot_dicts = data if isinstance(data, list) else [data]
                 else:
-                    # JSONL format
-                    snapshot_dicts = []
-                    for line in f:
-                        if line.strip():
-                            snapshot_dicts.append(json.loads(line))
+                    # JSONL format: undecoded byte lines straight into the parser
+                    snapshot_dicts = [loads_json(line) for line in f if not line.isspace()]
 
             # Convert dictionaries to snapshot objects
             loaded_snapshots = []
+            from_dict = StateSnapshot.from_dict
+            max_step = self._current_step
             for snapshot_dict in snapshot_dicts:
                 try:
-                    snapshot = StateSnapshot.from_dict(snapshot_dict)
+                    snapshot = from_dict(snapshot_dict)
                     loaded_snapshots.append(snapshot)
+                    if snapshot.step_number > max_step:
+                        max_step = snapshot.step_number
                 except Exception as e:
                     logger.warning(f"Failed to deserialize snapshot: {e}")
                     continue
 
             # Add to current snapshots
-            self.snapshots.extend(loaded_snapshots)
+            for snapshot in loaded_snapshots:
+                self._store_snapshot(snapshot)
 
             # Update tracking
-            if loaded_snapshots:
-                max_step = max(snapshot.step_number for snapshot in loaded_snapshots)
-                self._current_step = max(self._current_step, max_step)
+            self._current_step = max_step
 
             logger.info(f"Loaded {len(loaded_snapshots)} snapshots from {input_path}")
 
@@ -486,6 +657,8 @@ class StateTracker:
     def clear_snapshots(self):
         """Clear all snapshots from memory."""
         self.snapshots.clear()
+        self._approx_bytes = 0
+        self._step_index.clear()
         self._current_step = 0
         self._last_hash = None
         self._state_change_count = 0
@@ -4,7 +4,7 @@ Tests for enhanced agents: RetryManagedLLMAgent, ContextManagedLLMAgent, and Enh
 
 import pytest
 import time
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import AsyncMock, Mock, patch, MagicMock
 from dataclasses import dataclass
 
 from tau2.data_model.message import Message, SystemMessage, UserMessage, AssistantMessage
@@ -13,42 +13,83 @@ from tau2_enhanced.agents.context_agent import ContextManagedLLMAgent
 from tau2_enhanced.agents.enhanced_agent import EnhancedLLMAgent
 
 
-@dataclass
+@dataclass(slots=True)
 class MockState:
     """Mock state object for testing."""
     messages: list
 
     def __deepcopy__(self, memo):
-        from copy import deepcopy
-        return MockState(messages=deepcopy(self.messages, memo))
+        # Messages are treated as immutable, so only the list is copied
+        return MockState(messages=list(self.messages))
+
+
+def scripted(outcomes):
+    """
+    Build a side_effect that returns or raises each outcome in turn.
+
+    Args:
+        outcomes: Values to return, or exceptions to raise, one per call
+
+    Returns:
+        Callable suitable for a mock's side_effect
+    """
+    outcomes = iter(outcomes)
+
+    def next_outcome(*args, **kwargs):
+        outcome = next(outcomes)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    return next_outcome
+
+
+@pytest.fixture
+def retry_agent():
+    """RetryManagedLLMAgent with short delays for testing."""
+    agent = RetryManagedLLMAgent(sleep_fn=lambda delay: None)
+    agent.max_retries = 3
+    agent.retry_delay_base = 0.1  # Faster for testing
+    return agent
+
+
+@pytest.fixture
+def context_agent():
+    """ContextManagedLLMAgent with a small context limit for testing."""
+    agent = ContextManagedLLMAgent()
+    agent.context_limit = 1000  # Smaller limit for testing
+    return agent
+
+
+@pytest.fixture
+def enhanced_agent():
+    """EnhancedLLMAgent with a small context limit and fewer retries."""
+    agent = EnhancedLLMAgent(sleep_fn=lambda delay: None)
+    agent.context_limit = 1000  # Smaller for testing
+    agent.max_retries = 2  # Fewer retries for faster tests
+    return agent
 
 
 class TestRetryManagedLLMAgent:
     """Test suite for RetryManagedLLMAgent."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.agent = RetryManagedLLMAgent()
-        self.agent.max_retries = 3
-        self.agent.retry_delay_base = 0.1  # Faster for testing
-
-    def test_initialization(self):
+    def test_initialization(self, retry_agent):
         """Test agent initialization."""
-        assert self.agent.max_retries == 3
-        assert self.agent.retry_delay_base == 0.1
-        assert len(self.agent.retry_sequences) == 0
-        assert self.agent.retry_logger is not None
+        assert retry_agent.max_retries == 3
+        assert retry_agent.retry_delay_base == 0.1
+        assert len(retry_agent.retry_sequences) == 0
+        assert retry_agent.retry_logger is not None
 
-    def test_is_retryable_error(self):
+    def test_is_retryable_error(self, retry_agent):
         """Test error classification for retryability."""
         # Retryable errors
         validation_error = ValidationError("Missing required parameter")
         value_error = ValueError("Invalid parameter type")
         type_error = TypeError("Expected int, got str")
 
-        assert self.agent._is_retryable_error(validation_error)
-        assert self.agent._is_retryable_error(value_error)
-        assert self.agent._is_retryable_error(type_error)
+        assert retry_agent._is_retryable_error(validation_error)
+        assert retry_agent._is_retryable_error(value_error)
+        assert retry_agent._is_retryable_error(type_error)
 
         # Non-retryable errors
         runtime_error = RuntimeError("System error")
@@ -57,34 +98,34 @@ class TestRetryManagedLLMAgent:
         # These might still be retryable depending on message content
         # Test with specific non-retryable messages
         system_error = RuntimeError("System shutdown")
-        assert self.agent._is_retryable_error(system_error)  # Still retryable due to heuristics
+        assert retry_agent._is_retryable_error(system_error)  # Still retryable due to heuristics
 
-    def test_determine_recovery_strategy(self):
+    def test_determine_recovery_strategy(self, retry_agent):
         """Test recovery strategy determination."""
         # Type mismatch error
         type_error = ValidationError("Expected int, got str")
-        strategy = self.agent._determine_recovery_strategy(type_error)
+        strategy = retry_agent._determine_recovery_strategy(type_error)
         assert strategy == "type_correction"
 
         # Missing parameter error
         missing_error = ValidationError("Missing required parameter 'user_id'")
-        strategy = self.agent._determine_recovery_strategy(missing_error)
+        strategy = retry_agent._determine_recovery_strategy(missing_error)
         assert strategy == "parameter_completion"
 
         # Format error
         format_error = ValidationError("Invalid date format")
-        strategy = self.agent._determine_recovery_strategy(format_error)
+        strategy = retry_agent._determine_recovery_strategy(format_error)
         assert strategy == "format_correction"
 
         # Unknown error
         unknown_error = ValidationError("Something went wrong")
-        strategy = self.agent._determine_recovery_strategy(unknown_error)
+        strategy = retry_agent._determine_recovery_strategy(unknown_error)
         assert strategy == "generic_simplification"
 
-    def test_create_retry_guidance_message(self):
+    def test_create_retry_guidance_message(self, retry_agent):
         """Test retry guidance message creation."""
         error = ValidationError("Missing required parameter 'user_id'")
-        guidance = self.agent._create_retry_guidance_message(error, "parameter_completion", 1)
+        guidance = retry_agent._create_retry_guidance_message(error, "parameter_completion", 1)
 
         assert isinstance(guidance, SystemMessage)
         assert "Attempt 1/3" in guidance.content
@@ -92,60 +133,85 @@ class TestRetryManagedLLMAgent:
         assert "user_id" in guidance.content
 
     @patch('tau2_enhanced.agents.retry_agent.LLMAgent.generate_next_message')
-    def test_successful_generation_no_retry(self, mock_generate):
+    def test_successful_generation_no_retry(self, mock_generate, retry_agent):
         """Test successful message generation without retry."""
         mock_generate.return_value = "Success"
 
         state = MockState(messages=[])
-        result = self.agent.generate_next_message("test message", state)
+        result = retry_agent.generate_next_message("test message", state)
 
         assert result == "Success"
         mock_generate.assert_called_once()
-        assert len(self.agent.retry_sequences) == 0
+        assert len(retry_agent.retry_sequences) == 0
 
     @patch('tau2_enhanced.agents.retry_agent.LLMAgent.generate_next_message')
-    @patch('time.sleep')
-    def test_retry_success_on_second_attempt(self, mock_sleep, mock_generate):
+    def test_retry_success_on_second_attempt(self, mock_generate, retry_agent):
         """Test successful retry on second attempt."""
         # First call fails, second succeeds
-        mock_generate.side_effect = [
+        mock_generate.side_effect = scripted([
             ValidationError("Missing parameter"),
             "Success"
-        ]
+        ])
 
         state = MockState(messages=[SystemMessage(role="system", content="Test")])
-        result = self.agent.generate_next_message("test message", state)
+        result = retry_agent.generate_next_message("test message", state)
 
         assert result == "Success"
         assert mock_generate.call_count == 2
-        assert len(self.agent.retry_sequences) == 1
-        assert self.agent.retry_sequences[0].final_success is True
-        assert len(self.agent.retry_sequences[0].attempts) == 1
+        assert len(retry_agent.retry_sequences) == 1
+        assert retry_agent.retry_sequences[0].final_success is True
+        assert len(retry_agent.retry_sequences[0].attempts) == 1
 
     @patch('tau2_enhanced.agents.retry_agent.LLMAgent.generate_next_message')
-    @patch('time.sleep')
-    def test_retry_failure_after_max_attempts(self, mock_sleep, mock_generate):
+    def test_retry_failure_after_max_attempts(self, mock_generate, retry_agent):
         """Test retry failure after maximum attempts."""
         # All attempts fail
-        mock_generate.side_effect = [
+        mock_generate.side_effect = scripted([
             ValidationError("Error 1"),
             ValidationError("Error 2"),
             ValidationError("Error 3")
-        ]
+        ])
 
         state = MockState(messages=[SystemMessage(role="system", content="Test")])
 
         with pytest.raises(ValidationError):
-            self.agent.generate_next_message("test message", state)
+            retry_agent.generate_next_message("test message", state)
 
         assert mock_generate.call_count == 3
-        assert len(self.agent.retry_sequences) == 1
-        assert self.agent.retry_sequences[0].final_success is False
-        assert len(self.agent.retry_sequences[0].attempts) == 3
+        assert len(retry_agent.retry_sequences) == 1
+        assert retry_agent.retry_sequences[0].final_success is False
+        assert len(retry_agent.retry_sequences[0].attempts) == 3
+
+    @pytest.mark.asyncio
+    @patch('tau2_enhanced.agents.retry_agent.LLMAgent.generate_next_message')
+    async def test_retry_success_after_backoff_async(self, mock_generate):
+        """Test async retry awaiting the backoff before a later attempt succeeds."""
+        mock_sleep = AsyncMock()
+        agent = RetryManagedLLMAgent(sleep_fn=lambda delay: None, async_sleep_fn=mock_sleep)
+        agent.retry_delay_base = 0.1
+
+        # Original call and first retry fail, second retry succeeds
+        mock_generate.side_effect = scripted([
+            ValidationError("Missing parameter"),
+            ValidationError("Missing parameter"),
+            "Success"
+        ])
+
+        state = MockState(messages=[SystemMessage(role="system", content="Test")])
+        result = await agent.generate_next_message_async("test message", state)
 
-    def test_get_retry_statistics_empty(self):
+        assert result == "Success"
+        assert mock_generate.call_count == 3
+        mock_sleep.assert_awaited_once()
+        delay = mock_sleep.await_args.args[0]
+        assert 0.1 <= delay <= 0.2  # Base delay plus jitter
+        assert len(agent.retry_sequences) == 1
+        assert agent.retry_sequences[0].final_success is True
+        assert len(agent.retry_sequences[0].attempts) == 2
+
+    def test_get_retry_statistics_empty(self, retry_agent):
         """Test retry statistics with no retry attempts."""
-        stats = self.agent.get_retry_statistics()
+        stats = retry_agent.get_retry_statistics()
 
         assert stats['total_retry_sequences'] == 0
         assert stats['success_rate'] == 0.0
@@ -156,22 +222,17 @@ class TestRetryManagedLLMAgent:
 class TestContextManagedLLMAgent:
     """Test suite for ContextManagedLLMAgent."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.agent = ContextManagedLLMAgent()
-        self.agent.context_limit = 1000  # Smaller limit for testing
-
-    def test_initialization(self):
+    def test_initialization(self, context_agent):
         """Test agent initialization."""
-        assert self.agent.context_limit == 1000
-        assert self.agent.warning_threshold == 0.8
-        assert self.agent.critical_threshold == 0.95
-        assert len(self.agent.reduction_history) == 0
+        assert context_agent.context_limit == 1000
+        assert context_agent.warning_threshold == 0.8
+        assert context_agent.critical_threshold == 0.95
+        assert len(context_agent.reduction_history) == 0
 
-    def test_estimate_tokens_approximate(self):
+    def test_estimate_tokens_approximate(self, context_agent):
         """Test approximate token estimation."""
         # Force approximate estimation by setting tokenizer to None
-        self.agent.tokenizer = None
+        context_agent.tokenizer = None
 
         messages = [
             SystemMessage(role="system", content="This is a test message with some content"),
@@ -179,14 +240,14 @@ class TestContextManagedLLMAgent:
             AssistantMessage(role="assistant", content="Assistant response")
         ]
 
-        tokens = self.agent.estimate_tokens(messages)
+        tokens = context_agent.estimate_tokens(messages)
         assert tokens > 0
         assert isinstance(tokens, int)
 
     @patch('tau2_enhanced.agents.context_agent.TIKTOKEN_AVAILABLE', True)
-    def test_estimate_tokens_tiktoken(self):
+    def test_estimate_tokens_tiktoken(self, context_agent):
         """Test tiktoken-based token estimation."""
-        if not hasattr(self.agent, 'tokenizer') or self.agent.tokenizer is None:
+        if not hasattr(context_agent, 'tokenizer') or context_agent.tokenizer is None:
             pytest.skip("tiktoken not available in test environment")
 
         messages = [
@@ -194,11 +255,11 @@ class TestContextManagedLLMAgent:
             UserMessage(role="user", content="User input")
         ]
 
-        tokens = self.agent.estimate_tokens(messages)
+        tokens = context_agent.estimate_tokens(messages)
         assert tokens > 0
         assert isinstance(tokens, int)
 
-    def test_analyze_token_usage(self):
+    def test_analyze_token_usage(self, context_agent):
         """Test token usage analysis."""
         # Create messages that exceed warning threshold
         large_content = "x" * 500  # Large content to trigger warning
@@ -207,7 +268,7 @@ class TestContextManagedLLMAgent:
             UserMessage(role="user", content=large_content)
         ]
 
-        token_stats = self.agent._analyze_token_usage(messages)
+        token_stats = context_agent._analyze_token_usage(messages)
 
         assert token_stats.current_tokens > 0
         assert token_stats.limit_tokens == 1000
@@ -215,37 +276,37 @@ class TestContextManagedLLMAgent:
         assert token_stats.warning_threshold == 0.8
         assert token_stats.critical_threshold == 0.95
 
-    def test_is_verbose_message(self):
+    def test_is_verbose_message(self, context_agent):
         """Test verbose message detection."""
         short_message = SystemMessage(role="system", content="Short")
         long_message = SystemMessage(role="system", content="x" * 1500)
 
-        assert not self.agent._is_verbose_message(short_message)
-        assert self.agent._is_verbose_message(long_message)
+        assert not context_agent._is_verbose_message(short_message)
+        assert context_agent._is_verbose_message(long_message)
 
-    def test_compress_message_content(self):
+    def test_compress_message_content(self, context_agent):
         """Test message content compression."""
         long_content = "x" * 1000
         original_message = SystemMessage(role="system", content=long_content)
 
-        compressed = self.agent._compress_message_content(original_message, compression_level=0.5)
+        compressed = context_agent._compress_message_content(original_message, compression_level=0.5)
 
         assert len(compressed.content) < len(original_message.content)
         assert "[content truncated]" in compressed.content
         assert compressed.role == original_message.role
 
-    def test_compress_message_content_error(self):
+    def test_compress_message_content_error(self, context_agent):
         """Test compression of error messages."""
         error_content = "ERROR: Something went wrong with detailed information " * 50
         error_message = SystemMessage(role="system", content=error_content)
 
-        compressed = self.agent._compress_message_content(error_message, compression_level=0.3)
+        compressed = context_agent._compress_message_content(error_message, compression_level=0.3)
 
         assert len(compressed.content) < len(error_message.content)
         assert "[error details truncated]" in compressed.content
 
     @patch('tau2_enhanced.agents.context_agent.LLMAgent.generate_next_message')
-    def test_no_reduction_needed(self, mock_generate):
+    def test_no_reduction_needed(self, mock_generate, context_agent):
         """Test when no context reduction is needed."""
         mock_generate.return_value = "Success"
 
@@ -253,14 +314,14 @@ class TestContextManagedLLMAgent:
         messages = [SystemMessage(role="system", content="Short message")]
         state = MockState(messages=messages)
 
-        result = self.agent.generate_next_message("test", state)
+        result = context_agent.generate_next_message("test", state)
 
         assert result == "Success"
-        assert len(self.agent.reduction_history) == 0
+        assert len(context_agent.reduction_history) == 0
         mock_generate.assert_called_once()
 
     @patch('tau2_enhanced.agents.context_agent.LLMAgent.generate_next_message')
-    def test_context_reduction_applied(self, mock_generate):
+    def test_context_reduction_applied(self, mock_generate, context_agent):
         """Test when context reduction is applied."""
         mock_generate.return_value = "Success"
 
@@ -273,18 +334,18 @@ class TestContextManagedLLMAgent:
         ]
         state = MockState(messages=messages)
 
-        result = self.agent.generate_next_message("test", state)
+        result = context_agent.generate_next_message("test", state)
 
         assert result == "Success"
         # Context reduction should have been applied
-        assert len(self.agent.reduction_history) >= 1
+        assert len(context_agent.reduction_history) >= 1
         mock_generate.assert_called_once()
 
         # Check that the state passed to generate_next_message was modified
         called_state = mock_generate.call_args[0][1]
         assert len(called_state.messages) <= len(messages)
 
-    def test_calculate_information_preservation(self):
+    def test_calculate_information_preservation(self, context_agent):
         """Test information preservation calculation."""
         original_messages = [
             SystemMessage(role="system", content="x" * 100),
@@ -297,53 +358,47 @@ class TestContextManagedLLMAgent:
             UserMessage(role="user", content="x" * 50)
         ]
 
-        preservation = self.agent._calculate_information_preservation(
+        preservation = context_agent._calculate_information_preservation(
             original_messages, reduced_messages
         )
 
         assert 0 <= preservation <= 1
         assert preservation < 1  # Some information was lost
 
-    def test_get_context_statistics_empty(self):
+    def test_get_context_statistics_empty(self, context_agent):
         """Test context statistics with no reductions."""
-        stats = self.agent.get_context_statistics()
+        stats = context_agent.get_context_statistics()
 
         assert stats['total_reductions'] == 0
         assert stats['average_token_savings'] == 0
         assert stats['average_information_preservation'] == 0
 
-    def test_set_context_limit(self):
+    def test_set_context_limit(self, context_agent):
         """Test setting context limit."""
         new_limit = 2000
-        self.agent.set_context_limit(new_limit)
-        assert self.agent.context_limit == new_limit
+        context_agent.set_context_limit(new_limit)
+        assert context_agent.context_limit == new_limit
 
-    def test_set_reduction_thresholds(self):
+    def test_set_reduction_thresholds(self, context_agent):
         """Test setting reduction thresholds."""
-        self.agent.set_reduction_thresholds(warning=0.7, critical=0.9)
-        assert self.agent.warning_threshold == 0.7
-        assert self.agent.critical_threshold == 0.9
+        context_agent.set_reduction_thresholds(warning=0.7, critical=0.9)
+        assert context_agent.warning_threshold == 0.7
+        assert context_agent.critical_threshold == 0.9
 
 
 class TestEnhancedLLMAgent:
     """Test suite for EnhancedLLMAgent."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.agent = EnhancedLLMAgent()
-        self.agent.context_limit = 1000  # Smaller for testing
-        self.agent.max_retries = 2  # Fewer retries for faster tests
-
-    def test_initialization(self):
+    def test_initialization(self, enhanced_agent):
         """Test enhanced agent initialization."""
         # Should inherit from both parent classes
-        assert hasattr(self.agent, 'max_retries')  # From RetryManagedLLMAgent
-        assert hasattr(self.agent, 'context_limit')  # From ContextManagedLLMAgent
-        assert hasattr(self.agent, 'combined_metrics')  # Unique to EnhancedLLMAgent
-        assert self.agent.operation_counter == 0
+        assert hasattr(enhanced_agent, 'max_retries')  # From RetryManagedLLMAgent
+        assert hasattr(enhanced_agent, 'context_limit')  # From ContextManagedLLMAgent
+        assert hasattr(enhanced_agent, 'combined_metrics')  # Unique to EnhancedLLMAgent
+        assert enhanced_agent.operation_counter == 0
 
     @patch('tau2_enhanced.agents.enhanced_agent.LLMAgent.generate_next_message')
-    def test_successful_generation_no_enhancements(self, mock_generate):
+    def test_successful_generation_no_enhancements(self, mock_generate, enhanced_agent):
         """Test successful generation with no enhancements needed."""
         mock_generate.return_value = "Success"
 
@@ -351,16 +406,16 @@ class TestEnhancedLLMAgent:
         messages = [SystemMessage(role="system", content="Short")]
         state = MockState(messages=messages)
 
-        result = self.agent.generate_next_message("test", state)
+        result = enhanced_agent.generate_next_message("test", state)
 
         assert result == "Success"
-        assert self.agent.operation_counter == 1
-        assert self.agent.combined_metrics.total_operations == 1
-        assert self.agent.combined_metrics.operations_with_context_reduction == 0
-        assert self.agent.combined_metrics.operations_with_retry == 0
+        assert enhanced_agent.operation_counter == 1
+        assert enhanced_agent.combined_metrics.total_operations == 1
+        assert enhanced_agent.combined_metrics.operations_with_context_reduction == 0
+        assert enhanced_agent.combined_metrics.operations_with_retry == 0
 
     @patch('tau2_enhanced.agents.enhanced_agent.LLMAgent.generate_next_message')
-    def test_context_reduction_only(self, mock_generate):
+    def test_context_reduction_only(self, mock_generate, enhanced_agent):
         """Test generation with context reduction but no retry."""
         mock_generate.return_value = "Success"
 
@@ -373,41 +428,39 @@ class TestEnhancedLLMAgent:
         ]
         state = MockState(messages=messages)
 
-        result = self.agent.generate_next_message("test", state)
+        result = enhanced_agent.generate_next_message("test", state)
 
         assert result == "Success"
-        assert self.agent.combined_metrics.operations_with_context_reduction == 1
-        assert self.agent.combined_metrics.operations_with_retry == 0
+        assert enhanced_agent.combined_metrics.operations_with_context_reduction == 1
+        assert enhanced_agent.combined_metrics.operations_with_retry == 0
 
     @patch('tau2_enhanced.agents.enhanced_agent.LLMAgent.generate_next_message')
-    @patch('time.sleep')
-    def test_retry_only(self, mock_sleep, mock_generate):
+    def test_retry_only(self, mock_generate, enhanced_agent):
         """Test generation with retry but no context reduction."""
         # First call fails, second succeeds
-        mock_generate.side_effect = [
+        mock_generate.side_effect = scripted([
             ValidationError("Test error"),
             "Success"
-        ]
+        ])
 
         # Small message that doesn't trigger context reduction
         messages = [SystemMessage(role="system", content="Short")]
         state = MockState(messages=messages)
 
-        result = self.agent.generate_next_message("test", state)
+        result = enhanced_agent.generate_next_message("test", state)
 
         assert result == "Success"
-        assert self.agent.combined_metrics.operations_with_retry == 1
-        assert self.agent.combined_metrics.operations_with_context_reduction == 0
+        assert enhanced_agent.combined_metrics.operations_with_retry == 1
+        assert enhanced_agent.combined_metrics.operations_with_context_reduction == 0
 
     @patch('tau2_enhanced.agents.enhanced_agent.LLMAgent.generate_next_message')
-    @patch('time.sleep')
-    def test_both_enhancements(self, mock_sleep, mock_generate):
+    def test_both_enhancements(self, mock_generate, enhanced_agent):
         """Test generation with both context reduction and retry."""
         # First call fails, second succeeds
-        mock_generate.side_effect = [
+        mock_generate.side_effect = scripted([
             ValidationError("Test error"),
             "Success"
-        ]
+        ])
 
         # Large messages that trigger context reduction
         large_content = "x" * 400
@@ -418,16 +471,16 @@ class TestEnhancedLLMAgent:
         ]
         state = MockState(messages=messages)
 
-        result = self.agent.generate_next_message("test", state)
+        result = enhanced_agent.generate_next_message("test", state)
 
         assert result == "Success"
-        assert self.agent.combined_metrics.operations_with_context_reduction == 1
-        assert self.agent.combined_metrics.operations_with_retry == 1
-        assert self.agent.combined_metrics.operations_with_both == 1
+        assert enhanced_agent.combined_metrics.operations_with_context_reduction == 1
+        assert enhanced_agent.combined_metrics.operations_with_retry == 1
+        assert enhanced_agent.combined_metrics.operations_with_both == 1
 
-    def test_get_enhanced_statistics_empty(self):
+    def test_get_enhanced_statistics_empty(self, enhanced_agent):
         """Test enhanced statistics with no operations."""
-        stats = self.agent.get_enhanced_statistics()
+        stats = enhanced_agent.get_enhanced_statistics()
 
         assert stats['enhanced_agent_metrics']['total_operations'] == 0
         assert stats['enhanced_agent_metrics']['enhancement_usage_rate'] == 0
@@ -435,9 +488,9 @@ class TestEnhancedLLMAgent:
         assert 'retry_mechanism' in stats
         assert 'performance_analysis' in stats
 
-    def test_configure_enhanced_agent(self):
+    def test_configure_enhanced_agent(self, enhanced_agent):
         """Test enhanced agent configuration."""
-        self.agent.configure_enhanced_agent(
+        enhanced_agent.configure_enhanced_agent(
             context_limit=8000,
             warning_threshold=0.7,
             critical_threshold=0.9,
@@ -445,30 +498,30 @@ class TestEnhancedLLMAgent:
             retry_delay_base=1.0
         )
 
-        assert self.agent.context_limit == 8000
-        assert self.agent.warning_threshold == 0.7
-        assert self.agent.critical_threshold == 0.9
-        assert self.agent.max_retries == 5
-        assert self.agent.retry_delay_base == 1.0
+        assert enhanced_agent.context_limit == 8000
+        assert enhanced_agent.warning_threshold == 0.7
+        assert enhanced_agent.critical_threshold == 0.9
+        assert enhanced_agent.max_retries == 5
+        assert enhanced_agent.retry_delay_base == 1.0
 
-    def test_reset_enhanced_metrics(self):
+    def test_reset_enhanced_metrics(self, enhanced_agent):
         """Test resetting enhanced metrics."""
         # Set some metrics
-        self.agent.operation_counter = 5
-        self.agent.combined_metrics.total_operations = 5
+        enhanced_agent.operation_counter = 5
+        enhanced_agent.combined_metrics.total_operations = 5
 
-        self.agent.reset_enhanced_metrics()
+        enhanced_agent.reset_enhanced_metrics()
 
-        assert self.agent.operation_counter == 0
-        assert self.agent.combined_metrics.total_operations == 0
-        assert len(self.agent.reduction_history) == 0
-        assert len(self.agent.retry_sequences) == 0
+        assert enhanced_agent.operation_counter == 0
+        assert enhanced_agent.combined_metrics.total_operations == 0
+        assert len(enhanced_agent.reduction_history) == 0
+        assert len(enhanced_agent.retry_sequences) == 0
 
     @patch('tau2_enhanced.agents.enhanced_agent.LLMAgent.generate_next_message')
-    def test_create_enhanced_retry_guidance_message(self, mock_generate):
+    def test_create_enhanced_retry_guidance_message(self, mock_generate, enhanced_agent):
         """Test enhanced retry guidance message creation."""
         error = ValidationError("Test error")
-        guidance = self.agent._create_enhanced_retry_guidance_message(
+        guidance = enhanced_agent._create_enhanced_retry_guidance_message(
             error, "parameter_completion", 1, context_was_reduced=True
         )
 
@@ -476,18 +529,18 @@ class TestEnhancedLLMAgent:
         assert "Context has been optimized" in guidance.content
         assert "focus on recent conversation" in guidance.content
 
-    def test_calculate_enhancement_efficiency(self):
+    def test_calculate_enhancement_efficiency(self, enhanced_agent):
         """Test enhancement efficiency calculation."""
         # Test with no operations
-        efficiency = self.agent._calculate_enhancement_efficiency()
+        efficiency = enhanced_agent._calculate_enhancement_efficiency()
         assert efficiency == 0.0
 
         # Set some metrics to test calculation
-        self.agent.combined_metrics.total_operations = 1
-        self.agent.combined_metrics.total_tokens_saved = 1000
-        self.agent.combined_metrics.retry_success_rate = 0.8
+        enhanced_agent.combined_metrics.total_operations = 1
+        enhanced_agent.combined_metrics.total_tokens_saved = 1000
+        enhanced_agent.combined_metrics.retry_success_rate = 0.8
 
-        efficiency = self.agent._calculate_enhancement_efficiency()
+        efficiency = enhanced_agent._calculate_enhancement_efficiency()
         assert 0 <= efficiency <= 1
 
 